@@ -1,41 +1,42 @@
-import heapq
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
 from matplotlib.colors import LinearSegmentedColormap
 import copy
+from puzzle_state import PackedState, adjacent, direction
+from puzzle_heuristics import heuristic_table
+from bucket_queue import BucketQueue
+from node_store import NodeStore, ACTIONS, NO_PARENT
+from tree_render import draw_search_tree
 
 class PuzzleNode:
     def __init__(self, state, parent=None, action=None, path_cost=0):
-        self.state = state
+        # The board is stored packed into one integer; .state unpacks it on demand
+        self.key = state if isinstance(state, PackedState) else PackedState.from_array(state)
         self.parent = parent
         self.action = action
         self.path_cost = path_cost
         self.depth = 0
         if parent:
             self.depth = parent.depth + 1
+    
+    @property
+    def state(self):
+        return self.key.to_array()
         
     def __lt__(self, other):
         return self.path_cost < other.path_cost
         
     def __eq__(self, other):
-        return np.array_equal(self.state, other.state)
+        return self.key == other.key
     
     def __hash__(self):
-        return hash(str(self.state.flatten()))
+        return hash(self.key)
 
 def manhattan_distance(state, goal):
     """Calculate the Manhattan distance heuristic."""
-    distance = 0
-    for i in range(3):
-        for j in range(3):
-            if state[i][j] != 0:  # Skip the empty tile
-                # Find where this number is in the goal state
-                goal_pos = np.where(goal == state[i][j])
-                goal_i, goal_j = goal_pos[0][0], goal_pos[1][0]
-                # Calculate Manhattan distance
-                distance += abs(i - goal_i) + abs(j - goal_j)
-    return distance
+    # One lookup per tile in a (tile, position) table built once per goal
+    table = heuristic_table(tuple(np.asarray(goal).flatten().tolist()), 3)
+    return table.evaluate(state if isinstance(state, PackedState) else PackedState.from_array(state))
 
 def get_blank_position(state):
     """Find the position of the blank (0) in the puzzle."""
@@ -44,131 +45,94 @@ def get_blank_position(state):
 
 def get_neighbors(node):
     """Generate all possible next states by moving the blank tile."""
-    i, j = get_blank_position(node.state)
-    neighbors = []
-    moves = [('UP', -1, 0), ('DOWN', 1, 0), ('LEFT', 0, -1), ('RIGHT', 0, 1)]
-    
-    for move, di, dj in moves:
-        new_i, new_j = i + di, j + dj
-        if 0 <= new_i < 3 and 0 <= new_j < 3:  # Check if the move is valid
-            new_state = node.state.copy()
-            # Swap blank with the adjacent tile
-            new_state[i, j], new_state[new_i, new_j] = new_state[new_i, new_j], new_state[i, j]
-            neighbors.append(PuzzleNode(new_state, node, move, 0))
-    
-    return neighbors
+    blank = node.key.blank
+    # adjacent() lists the UP, DOWN, LEFT, RIGHT swaps that stay on the board
+    return [PuzzleNode(node.key.move(pos), node, direction(blank, pos, 3), 0)
+            for pos in adjacent(3)[blank]]
 
-def best_first_search(initial_state, goal_state):
-    """Solve 8-puzzle using Best First Search with Manhattan distance heuristic."""
-    initial_node = PuzzleNode(initial_state)
+def best_first_search(initial_state, goal_state, stats=None):
+    """Solve 8-puzzle using Best First Search with Manhattan distance heuristic.
+
+    Generated nodes live in a NodeStore (integer ids into typed columns)
+    and explored states are kept as packed integer codes, so no per-node
+    objects or graph dicts are built; PuzzleNode objects are only made for
+    the returned path. Returns (path, nodes, explored codes); the goal, if
+    found, is the last node in the store.
+    If a stats dict is given, nodes_expanded and peak_frontier are stored in it.
+    """
+    stats = {} if stats is None else stats
+    stats.update(nodes_expanded=0, peak_frontier=1)
     if np.array_equal(initial_state, goal_state):
-        return [initial_node], {}, []
-    
-    frontier = []
+        nodes = NodeStore(3)
+        nodes.add(PackedState.from_array(initial_state))
+        return [PuzzleNode(initial_state)], nodes, set()
+    
+    frontier = BucketQueue('lifo')  # Keyed by the integer heuristic; node ids are never compared
+    table = heuristic_table(tuple(goal_state.flatten().tolist()), 3)
+    goal_key = PackedState.from_array(goal_state)
+    nodes = NodeStore(3)
+    initial_key = PackedState.from_array(initial_state)
     # Priority is the heuristic value (Manhattan distance)
-    heapq.heappush(frontier, (manhattan_distance(initial_state, goal_state), initial_node))
+    root = nodes.add(initial_key, h=table.evaluate(initial_key))
+    frontier.push(nodes.h[root], root)
     
-    explored = set()
-    graph = {}  # For visualization
+    explored = set()  # Packed codes of expanded states
     
     while frontier:
-        _, current_node = heapq.heappop(frontier)
+        _, current = frontier.pop()
+        current_key = nodes.state(current)
         
         # Skip if we've already explored this state
-        if hash(current_node) in explored:
+        if current_key.code in explored:
             continue
         
         # Add to explored set
-        explored.add(hash(current_node))
+        explored.add(current_key.code)
+        stats['nodes_expanded'] += 1
         
-        # Generate all possible next states
-        for neighbor in get_neighbors(current_node):
-            if hash(neighbor) not in explored:
-                # Calculate heuristic for this neighbor
-                h = manhattan_distance(neighbor.state, goal_state)
-                neighbor.path_cost = h
+        # Generate all possible next states; adjacent() lists the UP, DOWN, LEFT, RIGHT swaps
+        for action, pos in zip(action_codes(current_key.blank), adjacent(3)[current_key.blank]):
+            neighbor_key = current_key.move(pos)
+            if neighbor_key.code not in explored:
+                # Only the moved tile changes, so update the parent's heuristic
+                h = table.update(current_key, nodes.h[current], neighbor_key)
+                neighbor = nodes.add(neighbor_key, current, action, nodes.depth[current] + 1, h)
                 
                 # Add to frontier with priority = heuristic
-                heapq.heappush(frontier, (h, neighbor))
-                
-                # Add to graph for visualization
-                if hash(current_node) not in graph:
-                    graph[hash(current_node)] = []
-                graph[hash(current_node)].append(hash(neighbor))
+                frontier.push(h, neighbor)
+                stats['peak_frontier'] = max(stats['peak_frontier'], len(frontier))
                 
                 # Check if we've found the goal
-                if np.array_equal(neighbor.state, goal_state):
-                    # Reconstruct path
-                    path = [neighbor]
-                    parent = neighbor.parent
-                    while parent:
-                        path.append(parent)
-                        parent = parent.parent
-                    path.reverse()
-                    
-                    return path, graph, list(explored)
-    
-    return [], graph, list(explored)  # No solution found
+                if neighbor_key == goal_key:
+                    # Reconstruct path by walking the parent column
+                    path = []
+                    for node in nodes.path(neighbor):
+                        path.append(PuzzleNode(nodes.state(node), path[-1] if path else None,
+                                               nodes.action_name(node), nodes.h[node]))
+                    return path, nodes, explored
+    
+    return [], nodes, explored  # No solution found
 
-def visualize_search_tree(path, graph, explored, initial_state, goal_state):
-    """Visualize the search tree using NetworkX and Matplotlib."""
-    G = nx.DiGraph()
-    
-    # Create node labels
-    node_labels = {}
-    
-    # Add nodes and edges to the graph
-    for parent, children in graph.items():
-        if parent not in G:
-            G.add_node(parent)
-            
-        for child in children:
-            if child not in G:
-                G.add_node(child)
-            G.add_edge(parent, child)
-    
-    # Set up colors for nodes
-    node_colors = []
-    goal_hash = None
-    
-    # Find path node hashes
-    path_hashes = set()
-    for node in path:
-        path_hashes.add(hash(node))
-        if np.array_equal(node.state, goal_state):
-            goal_hash = hash(node)
-    
-    # Setup positioning using hierarchical layout
-    pos = nx.nx_agraph.graphviz_layout(G, prog='dot')
-    
-    # Color the nodes
-    for node in G.nodes:
-        if node == hash(PuzzleNode(initial_state)):
-            node_colors.append('green')  # Initial state
-        elif node == goal_hash:
-            node_colors.append('red')    # Goal state
-        elif node in path_hashes:
-            node_colors.append('yellow') # Path to goal
-        else:
-            node_colors.append('skyblue')   # Other explored nodes
-    
-    plt.figure(figsize=(15, 10))
-    nx.draw(G, pos, with_labels=False, node_color=node_colors, node_size=500, arrows=True)
-    plt.title("8-Puzzle Best First Search Tree")
-    
-    # Add legend
-    legend_labels = {
-        'green': 'Initial State',
-        'red': 'Goal State',
-        'yellow': 'Path to Goal',
-        'skyblue': 'Explored Nodes'
-    }
-    
-    legend_handles = [plt.Line2D([0], [0], marker='o', color='w', 
-                               markerfacecolor=color, markersize=10) 
-                    for color in legend_labels.keys()]
-    
-    plt.legend(legend_handles, legend_labels.values(), loc='upper right')
+def action_codes(blank):
+    """NodeStore action codes of the moves adjacent(3)[blank] lists"""
+    return [ACTIONS.index(direction(blank, pos, 3)) for pos in adjacent(3)[blank]]
+
+def visualize_search_tree(path, nodes, explored, initial_state, goal_state, max_nodes=200):
+    """Visualize the search tree using Matplotlib.
+
+    The tree is rebuilt from the NodeStore's parent column, with node ids as
+    vertices. It can have tens of thousands of nodes, so it is drawn in
+    level-of-detail mode: subtrees off the solution path collapse into
+    counts, leaving at most max_nodes boards and markers.
+    """
+    children = {}
+    for child, parent in enumerate(nodes.columns()['parent'].tolist()):
+        if parent != NO_PARENT:
+            children.setdefault(parent, []).append(child)
+    fig, ax = plt.subplots(figsize=(15, 10))
+    draw_search_tree(ax, children, 0, nodes.path(len(nodes) - 1) if path else [],
+                     lambda node: nodes.state(node).tiles(), 3, max_nodes=max_nodes)
+    plt.title(f"8-Puzzle Best First Search Tree ({len(explored)} nodes explored)")
     
     plt.savefig('8puzzle_search_tree.png')
     plt.close()
@@ -225,14 +189,14 @@ def main():
     print(goal_state)
     
     # Solve using Best First Search
-    path, graph, explored = best_first_search(initial_state, goal_state)
+    path, nodes, explored = best_first_search(initial_state, goal_state)
     
     if path:
         print(f"Solution found in {len(path)-1} steps!")
         print(f"Nodes explored: {len(explored)}")
         
         # Visualize the search tree
-        visualize_search_tree(path, graph, explored, initial_state, goal_state)
+        visualize_search_tree(path, nodes, explored, initial_state, goal_state)
         
         # Print the solution path
         print("\nSolution path:")
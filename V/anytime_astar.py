@@ -0,0 +1,95 @@
+import heapq
+import time
+from itertools import count
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from puzzle_state import PackedState
+
+def ara_star(start: PackedState, goal: PackedState, table, neighbors: Callable,
+             weight: float = 3.0, step: float = 0.5, deadline: float = None,
+             stats: Dict[str, int] = None) -> Iterator[Tuple[List[PackedState], float]]:
+    """Anytime Repairing A* (Likhachev, Gordon and Thrun) on unit-cost moves.
+
+    Runs weighted A* with f = g + weight * h, yields the solution, then lowers
+    weight by step and repairs the search instead of restarting it: states
+    whose g improved after they were expanded are carried over to the next
+    round, and nothing else is expanded twice per round. Each yield is
+    (path, bound) where the path is at most bound times longer than optimal;
+    the generator stops after a round with bound 1, i.e. a proven optimum.
+
+    The deadline (a time.perf_counter() value) is only enforced once a first
+    solution exists, so a caller with a time budget always gets an answer.
+    If a stats dict is given, nodes_expanded and peak_frontier are kept in it.
+    """
+    stats = {} if stats is None else stats
+    stats.update(nodes_expanded=0, peak_frontier=1)
+    g = {start: 0}
+    h = {start: table.evaluate(start)}
+    parent = {start: None}
+    tie = count()  # Equal keys are popped in insertion order; states are never compared
+
+    def key(state):
+        return g[state] + weight * h[state]
+
+    open_set = {start}
+    heap = [(key(start), next(tie), start)]
+    closed = set()
+    incons = set()  # Improved after expansion in this round
+    solved = False
+
+    while True:
+        while heap:
+            f, _, state = heap[0]
+            if state not in open_set or f != key(state):
+                heapq.heappop(heap)  # Superseded entry
+                continue
+            if g.get(goal, float('inf')) <= f:
+                break
+            if solved and deadline is not None and time.perf_counter() > deadline:
+                return
+            heapq.heappop(heap)
+            open_set.discard(state)
+            closed.add(state)
+            stats['nodes_expanded'] += 1
+            for neighbor in neighbors(state):
+                new_g = g[state] + 1
+                if new_g < g.get(neighbor, float('inf')):
+                    g[neighbor] = new_g
+                    parent[neighbor] = state
+                    if neighbor not in h:
+                        h[neighbor] = table.update(state, h[state], neighbor)
+                    if neighbor in closed:
+                        incons.add(neighbor)
+                    else:
+                        open_set.add(neighbor)
+                        heapq.heappush(heap, (key(neighbor), next(tie), neighbor))
+            stats['peak_frontier'] = max(stats['peak_frontier'], len(open_set))
+
+        if goal not in g:
+            return
+        solved = True
+        # Sub-optimality bound: the cost found over the best lower bound left
+        lower = min((g[s] + h[s] for s in open_set | incons), default=g[goal])
+        bound = min(weight, g[goal] / lower) if lower else 1.0
+        path = []
+        state = goal
+        while state is not None:
+            path.append(state)
+            state = parent[state]
+        yield path[::-1], max(bound, 1.0)
+        if bound <= 1.0 or weight <= 1.0:
+            return
+        if deadline is not None and time.perf_counter() > deadline:
+            return
+
+        weight = max(1.0, weight - step)
+        open_set |= incons
+        incons = set()
+        closed = set()
+        heap = [(key(s), next(tie), s) for s in open_set]
+        heapq.heapify(heap)
+
+def weighted_a_star(start: PackedState, goal: PackedState, table, neighbors: Callable,
+                    weight: float = 2.0, stats: Dict[str, int] = None) -> Optional[List[PackedState]]:
+    """Weighted A* (f = g + weight * h): a path at most weight times the optimal length"""
+    path, _ = next(ara_star(start, goal, table, neighbors, weight, stats=stats), (None, None))
+    return path
@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from grid_search import GridMap, Cell
+
+Query = Tuple[Cell, Cell]
+
+# Set in each worker process by _attach_grid
+_worker_memory = None
+_worker_map = None
+
+def _attach_grid(name: str, rows: int, cols: int) -> None:
+    """Pool initializer: map the shared grid once per worker"""
+    global _worker_memory, _worker_map
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    blocked = np.ndarray(((rows + 2) * (cols + 2),), dtype=np.uint8, buffer=_worker_memory.buf)
+    _worker_map = GridMap.from_padded(blocked, rows, cols)
+
+def _plan_chunk(first: int, queries: Sequence[Query], method: str) -> Tuple[int, List[Optional[List[Cell]]]]:
+    search = getattr(_worker_map, method)
+    return first, [search(start, goal) for start, goal in queries]
+
+class BatchPlanner:
+    """Plans many independent (start, goal) routes on one map across a process pool.
+
+    The padded occupancy grid is copied into a multiprocessing shared
+    memory block once; every worker maps it when the pool starts, so a task
+    only carries its queries. Queries are sent in chunks to amortise the
+    per-task overhead and results are yielded as chunks finish, tagged
+    with their query index. Cells changed through self.grid_map between
+    batches are seen by the workers, since they read the same block. Use it
+    as a context manager, or call close() to stop the pool and free the
+    shared block; grid_map then keeps working on a private copy of the
+    cells.
+    """
+
+    def __init__(self, grid, workers: int = None, method: str = 'a_star'):
+        if method not in ('a_star', 'best_first', 'jump_point_search'):
+            raise ValueError(f"Unknown search method: {method}")
+        source = grid if isinstance(grid, GridMap) else GridMap(grid)
+        self.rows, self.cols = source.rows, source.cols
+        self.method = method
+        self.memory = shared_memory.SharedMemory(create=True, size=source.blocked.nbytes)
+        self.grid_map = GridMap.from_padded(np.ndarray(source.blocked.shape, dtype=np.uint8, buffer=self.memory.buf),
+                                            self.rows, self.cols)
+        self.grid_map.blocked[:] = source.blocked
+        try:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach_grid,
+                                            initargs=(self.memory.name, self.rows, self.cols))
+        except BaseException:
+            self.pool = None
+            self._release()
+            raise
+        self.stats: Dict[str, float] = {'queries': 0, 'seconds': 0.0, 'queries_per_second': 0.0}
+
+    def __enter__(self) -> 'BatchPlanner':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def plan(self, queries: Iterable[Query], chunk_size: int = 64) -> Iterator[Tuple[int, Optional[List[Cell]]]]:
+        """Yield (query index, path or None) in completion order.
+
+        Once the generator finishes (or is closed), stats holds the number of
+        paths delivered, the wall time and the aggregate queries per second.
+        """
+        queries = [(tuple(start), tuple(goal)) for start, goal in queries]
+        began = time.perf_counter()
+        futures = [self.pool.submit(_plan_chunk, first, queries[first:first + chunk_size], self.method)
+                   for first in range(0, len(queries), chunk_size)]
+        done = 0
+        try:
+            for future in as_completed(futures):
+                first, paths = future.result()
+                for offset, path in enumerate(paths):
+                    done += 1
+                    yield first + offset, path
+        finally:
+            for future in futures:
+                future.cancel()
+            seconds = time.perf_counter() - began
+            self.stats = {'queries': done, 'seconds': seconds,
+                          'queries_per_second': done / seconds if seconds > 0 else 0.0}
+
+    def plan_all(self, queries: Iterable[Query], chunk_size: int = 64) -> List[Optional[List[Cell]]]:
+        """Paths in query order"""
+        queries = list(queries)
+        paths = [None] * len(queries)
+        for index, path in self.plan(queries, chunk_size):
+            paths[index] = path
+        return paths
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+            self._release()
+
+    def _release(self) -> None:
+        """Free the shared block; grid_map moves onto a private copy so references to it stay valid"""
+        self.grid_map.detach()
+        self.memory.close()
+        self.memory.unlink()
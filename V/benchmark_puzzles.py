@@ -0,0 +1,283 @@
+"""Headless comparison of the 8-puzzle solvers.
+
+Every solver runs on the same seeded corpus of instances, bucketed by
+optimal solution depth, and the results are written as JSON and/or CSV so
+runs from different releases can be diffed.
+
+    python benchmark_puzzles.py --json results.json --csv results.csv
+
+--scaling additionally times hash-distributed A* with 1/2/4/8 worker
+processes on seeded 15-puzzle instances.
+"""
+import argparse
+import csv
+import gc
+import importlib
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')  # Solvers import pyplot; never open a window
+
+import numpy as np
+from distance_table import distance_table
+from hda_star import HDAStar
+from puzzle_state import PackedState, adjacent, solvable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+FIELDS = ['solver', 'instance', 'bucket', 'optimal_depth', 'solved', 'solution_length', 'optimal',
+          'wall_time', 'nodes_expanded', 'peak_frontier', 'peak_memory_kb']
+
+def load_notebook(name):
+    """Namespace of a notebook's code cells, run without the __main__ block"""
+    with open(os.path.join(HERE, name), encoding='utf-8') as f:
+        cells = json.load(f)['cells']
+    source = '\n'.join(''.join(cell['source']) for cell in cells if cell['cell_type'] == 'code')
+    namespace = {'__name__': name}
+    exec(compile(source, name, 'exec'), namespace)
+    return namespace
+
+def make_corpus(seed=0, per_bucket=5, bucket_width=4, goal=GOAL):
+    """per_bucket random solvable instances for each optimal-depth bucket.
+
+    Boards are drawn uniformly from the goal's parity class and their exact
+    depth is read from the distance table, so the corpus depends only on
+    the seed.
+    """
+    rng = random.Random(seed)
+    table = distance_table(goal)
+    goal_state = PackedState.from_tiles(goal, 3)
+    buckets = {}
+    wanted = (31 // bucket_width + 1) * per_bucket
+    tries = 0
+    # The shallowest depths hold very few states, so stop after a fixed budget
+    while sum(len(b) for b in buckets.values()) < wanted and tries < 200000:
+        tries += 1
+        tiles = list(goal)
+        rng.shuffle(tiles)
+        state = PackedState.from_tiles(tiles, 3)
+        if not solvable(state, goal_state):
+            continue
+        depth = table.evaluate(state)
+        bucket = depth // bucket_width * bucket_width
+        instances = buckets.setdefault(bucket, [])
+        if len(instances) < per_bucket and tuple(tiles) not in (i['start'] for i in instances):
+            instances.append({'start': tuple(tiles), 'goal': tuple(goal), 'optimal_depth': depth,
+                              'bucket': f'{bucket}-{bucket + bucket_width - 1}'})
+    corpus = [instance for bucket in sorted(buckets) for instance in buckets[bucket]]
+    for i, instance in enumerate(corpus):
+        instance['instance'] = i
+    return corpus
+
+def solver_registry():
+    """name -> function(start, goal) returning (solution_length or None, stats)"""
+    npuzzle = importlib.import_module('npuzzle')
+    puzz_bfs = importlib.import_module('8_puzz_bfs')
+    hill_climbing = importlib.import_module('hill_climbing')
+    best_first_nb = load_notebook('4-Best-fir-8-puzzle.ipynb')
+    astar_nb = load_notebook('5-astar-npuzzle.ipynb')
+
+    def length(path):
+        return None if not path else len(path) - 1
+
+    def puzzle_solver(method):
+        def run(start, goal):
+            solver = npuzzle.PuzzleSolver(start, goal)
+            if method == 'a_star_search':
+                path, _ = solver.a_star_search(plot=False)
+            elif method == 'bidirectional_search':
+                path, _ = solver.bidirectional_search()
+            else:
+                path = getattr(solver, method)()
+            return length(path), solver.stats
+        return run
+
+    def puzz_bfs_best_first(start, goal):
+        stats = {}
+        path, _, _ = puzz_bfs.best_first_search(np.array(start).reshape(3, 3), np.array(goal).reshape(3, 3), stats)
+        return length(path), stats
+
+    def hill(start, goal):
+        solver = hill_climbing.PuzzleHillClimbing(np.array(start).reshape(3, 3), np.array(goal).reshape(3, 3))
+        solver.solve()
+        return solver.stats['solution_length'], solver.stats
+
+    def notebook_best_first(heuristic):
+        def run(start, goal):
+            stats = {}
+            solved, path, _, _, _ = best_first_nb['best_first_search'](start, goal, best_first_nb[heuristic], stats)
+            return (length(path) if solved else None), stats
+        return run
+
+    def notebook_astar(kind, method='a_star_search'):
+        def run(start, goal):
+            solver = astar_nb['NPuzzleSolverAStar'](start, goal, 3, heuristic_kind=kind)
+            path = solver.a_star_search(plot=False) if method == 'a_star_search' else getattr(solver, method)()
+            return length(path), solver.stats
+        return run
+
+    return {
+        'npuzzle.astar_misplaced': puzzle_solver('a_star_search'),
+        'npuzzle.bidirectional_misplaced': puzzle_solver('bidirectional_search'),
+        'npuzzle.ida_misplaced': puzzle_solver('ida_star_search'),
+        'npuzzle.distance_table': puzzle_solver('table_search'),
+        '8_puzz_bfs.best_first_manhattan': puzz_bfs_best_first,
+        'hill_climbing.steepest': hill,
+        'notebook.best_first_misplaced': notebook_best_first('misplaced_tiles'),
+        'notebook.best_first_manhattan': notebook_best_first('manhattan_distance'),
+        'notebook.astar_manhattan': notebook_astar('manhattan'),
+        'notebook.astar_linear_conflict': notebook_astar('linear_conflict'),
+        'notebook.ida_pdb': notebook_astar('pdb', 'ida_star_search'),
+    }
+
+def run_one(solve, instance, measure_memory=True):
+    """Time a solver on one instance; peak memory comes from a second, traced run"""
+    gc.collect()
+    began = time.perf_counter()
+    solution_length, stats = solve(instance['start'], instance['goal'])
+    wall_time = time.perf_counter() - began
+    peak_memory_kb = None
+    if measure_memory:
+        gc.collect()
+        tracemalloc.start()
+        solve(instance['start'], instance['goal'])
+        peak_memory_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return {
+        'solved': solution_length is not None,
+        'solution_length': solution_length,
+        'optimal': solution_length == instance['optimal_depth'],
+        'wall_time': round(wall_time, 6),
+        'nodes_expanded': stats.get('nodes_expanded'),
+        'peak_frontier': stats.get('peak_frontier'),
+        'peak_memory_kb': peak_memory_kb,
+    }
+
+def run_benchmark(corpus, solvers, measure_memory=True, quiet=True):
+    records = []
+    for name, solve in solvers.items():
+        for instance in corpus:
+            stdout = sys.stdout
+            if quiet:
+                sys.stdout = open(os.devnull, 'w')  # Solvers print progress
+            try:
+                result = run_one(solve, instance, measure_memory)
+            finally:
+                if quiet:
+                    sys.stdout.close()
+                    sys.stdout = stdout
+            records.append({'solver': name, 'instance': instance['instance'], 'bucket': instance['bucket'],
+                            'optimal_depth': instance['optimal_depth'], **result})
+    return records
+
+def summarize(records):
+    """Per solver and depth bucket: solve rate, optimal rate and mean cost"""
+    groups = {}
+    for record in records:
+        groups.setdefault((record['solver'], record['bucket']), []).append(record)
+    summary = []
+    for (solver, bucket), rows in groups.items():
+        summary.append({
+            'solver': solver,
+            'bucket': bucket,
+            'instances': len(rows),
+            'solve_rate': sum(r['solved'] for r in rows) / len(rows),
+            'optimal_rate': sum(r['optimal'] for r in rows) / len(rows),
+            'mean_wall_time': sum(r['wall_time'] for r in rows) / len(rows),
+            'mean_nodes_expanded': sum(r['nodes_expanded'] or 0 for r in rows) / len(rows),
+            'max_peak_frontier': max(r['peak_frontier'] or 0 for r in rows),
+            'max_peak_memory_kb': max((r['peak_memory_kb'] for r in rows if r['peak_memory_kb'] is not None),
+                                      default=None),
+        })
+    return summary
+
+def print_summary(summary):
+    print(f"{'solver':<34} {'bucket':>7} {'solved':>7} {'optimal':>8} {'time (s)':>10} {'nodes':>10} {'memory (KB)':>12}")
+    for row in summary:
+        memory = row['max_peak_memory_kb']
+        print(f"{row['solver']:<34} {row['bucket']:>7} {row['solve_rate']:>7.0%} {row['optimal_rate']:>8.0%} "
+              f"{row['mean_wall_time']:>10.4f} {row['mean_nodes_expanded']:>10.0f} {'-' if memory is None else memory:>12}")
+
+def scaling_corpus(seed=0, instances=3, walk_length=80, size=4):
+    """Seeded random-walk scrambles of the solved size x size board"""
+    rng = random.Random(seed)
+    goal = tuple(range(1, size * size)) + (0,)
+    corpus = []
+    for _ in range(instances):
+        state = PackedState.from_tiles(goal, size)
+        for _ in range(walk_length):
+            state = state.move(rng.choice(adjacent(size)[state.blank]))
+        corpus.append({'start': state.tiles(), 'goal': goal, 'size': size})
+    return corpus
+
+def run_scaling(corpus, worker_counts=(1, 2, 4, 8), heuristic_kind='linear_conflict'):
+    """HDA* on each instance with each worker count; speedup is against one worker"""
+    records = []
+    for i, instance in enumerate(corpus):
+        baseline = None
+        for workers in worker_counts:
+            search = HDAStar(instance['start'], instance['goal'], instance['size'], heuristic_kind, workers)
+            path = search.search()
+            baseline = baseline or search.elapsed
+            records.append({'instance': i, 'workers': workers, 'solution_length': len(path) - 1,
+                            'wall_time': round(search.elapsed, 4), 'speedup': round(baseline / search.elapsed, 3),
+                            'nodes_expanded': search.nodes_expanded,
+                            'expanded_per_worker': search.expanded_per_worker})
+    return records
+
+def print_scaling(records):
+    print(f"\nHDA* scaling ({os.cpu_count()} CPUs available)")
+    print(f"{'instance':>8} {'workers':>8} {'length':>7} {'time (s)':>10} {'speedup':>8} {'nodes':>10}")
+    for row in records:
+        print(f"{row['instance']:>8} {row['workers']:>8} {row['solution_length']:>7} {row['wall_time']:>10.3f} "
+              f"{row['speedup']:>8.2f} {row['nodes_expanded']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the 8-puzzle solvers on a seeded corpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--per-bucket', type=int, default=3)
+    parser.add_argument('--bucket-width', type=int, default=4)
+    parser.add_argument('--max-depth', type=int, default=31, help="Skip instances deeper than this")
+    parser.add_argument('--solvers', nargs='*', help="Solver names to run (default: all)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced run for peak memory")
+    parser.add_argument('--scaling', action='store_true', help="Also time HDA* with 1/2/4/8 workers")
+    parser.add_argument('--scaling-instances', type=int, default=3)
+    parser.add_argument('--scaling-walk', type=int, default=80, help="Random moves per 15-puzzle scramble")
+    parser.add_argument('--json', help="Write records and summary to this JSON file")
+    parser.add_argument('--csv', help="Write one CSV row per solver and instance to this file")
+    args = parser.parse_args()
+
+    corpus = [i for i in make_corpus(args.seed, args.per_bucket, args.bucket_width)
+              if i['optimal_depth'] <= args.max_depth]
+    solvers = solver_registry()
+    if args.solvers:
+        unknown = set(args.solvers) - set(solvers)
+        if unknown:
+            parser.error(f"unknown solvers: {', '.join(sorted(unknown))}; choose from {', '.join(solvers)}")
+        solvers = {name: solvers[name] for name in args.solvers}
+
+    records = run_benchmark(corpus, solvers, measure_memory=not args.no_memory)
+    summary = summarize(records)
+    print_summary(summary)
+    scaling = None
+    if args.scaling:
+        scaling = run_scaling(scaling_corpus(args.seed, args.scaling_instances, args.scaling_walk))
+        print_scaling(scaling)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'seed': args.seed, 'corpus': corpus, 'records': records, 'summary': summary,
+                       'scaling': scaling, 'cpu_count': os.cpu_count()}, f, indent=1)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,15 @@
-from collections import deque
 import matplotlib.pyplot as plt
 import networkx as nx
-
-def is_goal_state(state, z):
-    return state[0] == z or state[1] == z
-
-def generate_next_states(state, max_x, max_y):
-    x, y = state
-    return [
-        (max_x, y),  # Fill jug X
-        (x, max_y),  # Fill jug Y
-        (0, y),      # Empty jug X
-        (x, 0),      # Empty jug Y
-        (x - min(x, max_y - y), y + min(x, max_y - y)),  # Pour X -> Y
-        (x + min(y, max_x - x), y - min(y, max_x - x))   # Pour Y -> X
-    ]
+from tree_layout import tidy_tree_layout
+from jug_search import JugSearch
+from jug_math import is_measurable
 
 def draw_tree(graph, path=None):
     plt.figure(figsize=(15, 10))
     
-    # Get the levels for each node
-    levels = nx.get_node_attributes(graph, 'subset')
-    
-    # Create a hierarchical layout
-    pos = {}
-    nodes_by_level = {}
-    
-    # Group nodes by level
-    for node, level in levels.items():
-        if level not in nodes_by_level:
-            nodes_by_level[level] = []
-        nodes_by_level[level].append(node)
-    
-    # Calculate positions for each node
-    max_nodes_in_level = max(len(nodes) for nodes in nodes_by_level.values())
-    for level, nodes in nodes_by_level.items():
-        n_nodes = len(nodes)
-        for i, node in enumerate(nodes):
-            # Center the nodes at each level
-            x = (i - (n_nodes - 1)/2) * (15.0/max_nodes_in_level)
-            y = -level * 1.5  # Negative to grow downward
-            pos[node] = (x, y)
+    # Tidy tree layout; node depths come out of the same O(n) pass
+    root = next(iter(graph.nodes()))
+    pos, levels = tidy_tree_layout(graph, root, dx=1.0, dy=1.5)
     
     # Draw the tree
     # Draw edges first
@@ -73,54 +42,32 @@ def draw_tree(graph, path=None):
     plt.tight_layout()
     plt.show()
 
-def bfs_water_jug(x, y, z):
-    if z > max(x, y):
+def bfs_water_jug(x, y, z, strategy="bfs"):
+    """Solve with plain BFS (strategy="bfs") or bidirectional BFS ("bidirectional")"""
+    # Anything that does not fit or is not a multiple of gcd(x, y) is unreachable
+    if not is_measurable(x, y, z):
         print("Impossible to measure this amount.")
         return
     
-    queue = deque([(0, 0)])
-    visited = set()
-    parent = {}
-    graph = nx.DiGraph()
-    
-    # Initialize the starting node
-    graph.add_node((0, 0), subset=0)
-    levels = {(0, 0): 0}
+    # Visited, parent and level data live in flat arrays: state (a, b) -> a*(max_y+1)+b, with max_y = y
+    search = JugSearch(x, y)
+    goal = search.bidirectional(z) if strategy == "bidirectional" else search.bfs(z)
+    graph = search.to_graph()
     
-    while queue:
-        state = queue.popleft()
-        if state in visited:
-            continue
-            
-        visited.add(state)
+    if goal != -1:
+        path = search.path(goal)
         
-        if is_goal_state(state, z):
-            path = []
-            current = state
-            while current is not None:
-                path.append(current)
-                current = parent.get(current)
-            path = path[::-1]
-            
-            print("\nSolution path (BFS):", path)
-            print("\nSteps to solve:")
-            for i in range(len(path)-1):
-                print(f"Step {i+1}: From {path[i]} to {path[i+1]}")
-            
-            draw_tree(graph, path)
-            return
+        print("\nSolution path (BFS):", path)
+        print("Nodes expanded:", search.nodes_expanded)
+        print("\nSteps to solve:")
+        for i in range(len(path)-1):
+            print(f"Step {i+1}: From {path[i]} to {path[i+1]}")
         
-        for next_state in generate_next_states(state, x, y):
-            if next_state not in visited and next_state not in queue:
-                queue.append(next_state)
-                parent[next_state] = state
-                
-                level = levels[state] + 1
-                graph.add_node(next_state, subset=level)
-                graph.add_edge(state, next_state)
-                levels[next_state] = level
+        draw_tree(graph, path)
+        return
     
     print("No solution found (BFS).")
+    print("Nodes expanded:", search.nodes_expanded)
     draw_tree(graph)
 
 def main():
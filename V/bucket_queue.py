@@ -0,0 +1,125 @@
+from typing import Any, List, Tuple
+
+class BucketQueue:
+    """Priority queue for small non-negative integer keys, e.g. f-values of a unit-cost search.
+
+    Items sit in one list per key, and a pointer tracks the lowest key that
+    may still be occupied, so push is O(1) and pop is O(1) amortised while
+    keys grow monotonically (as f does with a consistent heuristic). Items
+    themselves are never compared.
+
+    Ties inside a key are broken according to tie_break:
+        'lifo': the most recently pushed item first
+        'high_g': the item with the largest g first, which for A* means the
+            one closest to the goal
+        'fifo': the oldest item first
+
+    For 'high_g' each key holds a second bucket array indexed by level =
+    key - g (h for A*), covering only the window of levels pushed to that
+    key, and a cursor on its lowest occupied level. A push lowers the
+    cursor if needed and a pop advances it over emptied levels, so both are
+    O(1) amortised as long as a key's levels stay close together (as they
+    do when A* pushes children one level below their parent). Growing a
+    key's window costs the number of new levels.
+
+    A key's buckets are created on its first push and dropped once it
+    empties, so a long run of keys costs little more than the live ones.
+    """
+
+    def __init__(self, tie_break: str = 'lifo'):
+        if tie_break not in ('lifo', 'high_g', 'fifo'):
+            raise ValueError(f"Unknown tie_break {tie_break!r}")
+        self.tie_break = tie_break
+        self.buckets: List[Any] = []  # Per key: None, a list, or for high_g a list of per-level lists
+        self.counts: List[int] = []
+        self.heads: List[int] = []  # Per key: FIFO read position, or for high_g the cursor level
+        self.bases: List[int] = []  # Per key, high_g only: level of the key's first level bucket
+        self.low = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def push(self, key: int, item: Any, g: int = 0) -> None:
+        if key < 0:
+            raise ValueError("BucketQueue keys must be non-negative integers")
+        while key >= len(self.buckets):
+            self.buckets.append(None)
+            self.counts.append(0)
+            self.heads.append(0)
+            self.bases.append(0)
+        bucket = self.buckets[key]
+        if self.tie_break == 'high_g':
+            level = key - g
+            if level < 0:
+                raise ValueError("BucketQueue 'high_g' needs g <= key")
+            if bucket is None:
+                self.buckets[key] = [[item]]
+                self.bases[key] = self.heads[key] = level
+            else:
+                base = self.bases[key]
+                if level < base:
+                    bucket[0:0] = [None] * (base - level)
+                    self.bases[key] = base = level
+                i = level - base
+                if i >= len(bucket):
+                    bucket.extend([None] * (i + 1 - len(bucket)))
+                if bucket[i] is None:
+                    bucket[i] = [item]
+                else:
+                    bucket[i].append(item)
+                if level < self.heads[key]:
+                    self.heads[key] = level
+        elif bucket is None:
+            self.buckets[key] = [item]
+        else:
+            bucket.append(item)
+        self.counts[key] += 1
+        self.size += 1
+        if key < self.low:
+            self.low = key
+
+    def min_key(self) -> int:
+        """Smallest key currently in the queue"""
+        if not self.size:
+            raise IndexError("min_key of an empty BucketQueue")
+        while not self.counts[self.low]:
+            self.low += 1
+        return self.low
+
+    def peek(self) -> Tuple[int, Any]:
+        """(key, item) that pop() would return, left in the queue"""
+        key = self.min_key()
+        bucket = self.buckets[key]
+        if self.tie_break == 'high_g':
+            return key, bucket[self.heads[key] - self.bases[key]][-1]
+        if self.tie_break == 'fifo':
+            return key, bucket[self.heads[key]]
+        return key, bucket[-1]
+
+    def pop(self) -> Tuple[int, Any]:
+        """Remove and return (key, item) with the smallest key"""
+        key, item = self.peek()
+        bucket = self.buckets[key]
+        if self.tie_break == 'high_g':
+            i = self.heads[key] - self.bases[key]
+            bucket[i].pop()
+            if not bucket[i]:
+                bucket[i] = None
+                if self.counts[key] > 1:
+                    while bucket[i] is None:  # Some later level is still occupied
+                        i += 1
+                    self.heads[key] = self.bases[key] + i
+        elif self.tie_break == 'fifo':
+            self.heads[key] += 1
+        else:
+            bucket.pop()
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            self.buckets[key] = None
+            self.heads[key] = 0
+        self.size -= 1
+        return key, item
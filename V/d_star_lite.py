@@ -0,0 +1,198 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from grid_search import GridMap, Cell
+
+INF = np.iinfo(np.int32).max  # g and rhs of cells with no known route to the goal
+REPAIR_BUDGET = 2000  # Expansions per plan() before it answers with a fresh A* instead
+
+class DStarLite:
+    """D* Lite (Koenig and Likhachev) on a 4-connected grid with unit step costs.
+
+    The search runs backwards from the goal, so g[s] is the distance from s
+    to the goal and the robot's start can move without invalidating it.
+    g and rhs live in int32 arrays over the GridMap's flat cells and are
+    kept between calls: set_blocked() re-evaluates only the changed cells
+    and their neighbours, and the next plan repairs the part of the search
+    those changes reach. Moving the robot shifts every priority by the same
+    heuristic offset km instead of rebuilding the queue.
+
+    Ties on k1 differ from the paper's (k1, min(g, rhs)) order. Underconsistent
+    cells still come first, but among the rest the cell with the largest
+    rhs, the one nearest the start, wins. A search then runs toward the
+    start like A* instead of settling every cell on the optimal cost
+    contour.
+
+    Most replans touch a handful of cells, but one whose new route is
+    another path of the same cost has to settle the tied cells that
+    earlier searches skipped, which can be most of the map. plan()
+    therefore expands at most repair_budget cells per call. If the repair
+    is not finished by then, the path comes from a fresh GridMap.a_star
+    and the rest of the repair carries over to later calls, since the
+    queue always holds exactly the inconsistent cells. A replan then costs
+    at most the budget plus one A* search; on maps where a forward A* is
+    itself slow, so is that replan.
+
+    Neighbours and costs follow robo_nav_bfs.get_neighbors (up, down, left,
+    right through free cells, cost 1) and the heuristic is
+    robo_nav_bfs.manhattan_distance.
+    """
+
+    def __init__(self, grid, start: Cell, goal: Cell, repair_budget: Optional[int] = REPAIR_BUDGET):
+        self.grid_map = grid if isinstance(grid, GridMap) else GridMap(grid)
+        if not (self.grid_map.free(start) and self.grid_map.free(goal)):
+            raise ValueError("start and goal must be free cells")
+        size = self.grid_map.size
+        self._g_array = np.full(size, INF, dtype=np.int32)
+        self._rhs_array = np.full(size, INF, dtype=np.int32)
+        self.g = memoryview(self._g_array)
+        self.rhs = memoryview(self._rhs_array)
+        self.start = self.grid_map.index(start)
+        self.goal = self.grid_map.index(goal)
+        self.repair_budget = repair_budget  # None lets every plan() finish its repair
+        self.km = 0
+        self.open_keys: Dict[int, Tuple[int, int]] = {}  # Queued cell -> its current key
+        self.heap: List[Tuple[int, int, int]] = []  # (k1, k2, cell), with stale entries skipped on pop
+        self.rhs[self.goal] = 0
+        self._push(self.goal)
+
+    @property
+    def goal_cell(self) -> Cell:
+        return self.grid_map.cell(self.goal)
+
+    @property
+    def start_cell(self) -> Cell:
+        return self.grid_map.cell(self.start)
+
+    def _h(self, index: int) -> int:
+        """Manhattan distance from the robot's start to index"""
+        r0, c0 = divmod(self.start, self.grid_map.width)
+        r1, c1 = divmod(index, self.grid_map.width)
+        return abs(r0 - r1) + abs(c0 - c1)
+
+    def _key(self, index: int) -> Tuple[int, int]:
+        g, rhs = self.g[index], self.rhs[index]
+        m = min(g, rhs)
+        if m == INF:
+            return INF, INF
+        k1 = m + self._h(index) + self.km
+        if g < rhs:
+            return k1, g - 2 * INF  # Underconsistent cells win k1 ties, in LPA*'s min(g, rhs) order
+        return k1, -rhs  # Then the cell nearest the start, so ties are settled along the search front
+
+    def _push(self, index: int) -> None:
+        key = self.open_keys[index] = self._key(index)
+        heapq.heappush(self.heap, (key[0], key[1], index))
+        if len(self.heap) > 2 * len(self.open_keys) + 1024:  # Drop stale entries once they dominate
+            self.heap = [(k1, k2, cell) for cell, (k1, k2) in self.open_keys.items()]
+            heapq.heapify(self.heap)
+
+    def _top(self) -> Optional[Tuple[int, int, int]]:
+        heap, open_keys = self.heap, self.open_keys
+        while heap:
+            k1, k2, cell = heap[0]
+            if open_keys.get(cell) == (k1, k2):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _update_vertex(self, index: int) -> None:
+        if self.grid_map.blocked[index]:
+            self.rhs[index] = INF
+        elif index == self.goal:
+            self.rhs[index] = 0
+        else:
+            g = self.g
+            best = min(g[index + offset] for offset in self.grid_map.offsets)
+            self.rhs[index] = best + 1 if best < INF else INF
+        self.open_keys.pop(index, None)
+        if self.g[index] != self.rhs[index]:
+            self._push(index)
+
+    def compute_shortest_path(self, stats: Dict[str, int] = None, budget: Optional[int] = None) -> bool:
+        """Process queued cells until the start's g-value is correct.
+
+        Returns False if budget expansions were used up first. The queue
+        then still holds every inconsistent cell, so a later call carries
+        on with the repair.
+        """
+        stats = {} if stats is None else stats
+        stats.update(nodes_expanded=0)
+        g, rhs, offsets = self.g, self.rhs, self.grid_map.offsets
+        expanded = 0
+        done = True
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            start_key = self._key(self.start)
+            if (top[0], top[1]) >= start_key and rhs[self.start] == g[self.start]:
+                break
+            if expanded == budget:
+                done = False
+                break
+            k1, k2, u = top
+            new_key = self._key(u)
+            if (k1, k2) < new_key:
+                self._push(u)
+                continue
+            heapq.heappop(self.heap)
+            del self.open_keys[u]
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for offset in offsets:
+                    self._update_vertex(u + offset)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for offset in offsets:
+                    self._update_vertex(u + offset)
+        stats['nodes_expanded'] = expanded
+        return done
+
+    def path(self) -> Optional[List[Cell]]:
+        """Cells from the start to the goal by descending g, or None if the goal is unreachable"""
+        g, blocked, offsets = self.g, self.grid_map.blocked, self.grid_map.offsets
+        current = self.start
+        if g[current] == INF:
+            return None
+        path = [self.grid_map.cell(current)]
+        while current != self.goal:
+            current = min((current + offset for offset in offsets if not blocked[current + offset]),
+                          key=lambda index: g[index])
+            path.append(self.grid_map.cell(current))
+        return path
+
+    def plan(self, stats: Dict[str, int] = None) -> Optional[List[Cell]]:
+        """Repair the search within repair_budget expansions and return the path.
+
+        stats gets nodes_expanded and fallback, which is True when the
+        repair ran out of budget and the path came from GridMap.a_star.
+        """
+        stats = {} if stats is None else stats
+        stats['fallback'] = not self.compute_shortest_path(stats, self.repair_budget)
+        if stats['fallback']:
+            return self.grid_map.a_star(self.start_cell, self.goal_cell)
+        return self.path()
+
+    def set_blocked(self, cells: Iterable[Cell], blocked: bool = True,
+                    stats: Dict[str, int] = None) -> Optional[List[Cell]]:
+        """Apply a batch of cell changes and replan from the current start"""
+        changed = self.grid_map.set_blocked(cells, blocked)
+        touched = set()
+        for cell in changed:
+            index = self.grid_map.index(cell)
+            touched.add(index)
+            touched.update(index + offset for offset in self.grid_map.offsets)
+        for index in touched:
+            self._update_vertex(index)
+        return self.plan(stats)
+
+    def move_robot(self, new_start: Cell, stats: Dict[str, int] = None) -> Optional[List[Cell]]:
+        """Move the start to new_start (e.g. the next cell of the path) and replan from there"""
+        if not self.grid_map.free(new_start):
+            raise ValueError(f"{new_start} is not a free cell")
+        self.km += self._h(self.grid_map.index(new_start))  # h(old start, new start)
+        self.start = self.grid_map.index(new_start)
+        return self.plan(stats)
@@ -1,56 +1,22 @@
-from collections import deque
 import matplotlib.pyplot as plt
 import networkx as nx
+from tree_layout import tidy_tree_layout
 import math
-
-def is_goal_state(state, z):
-    return state[0] == z or state[1] == z
-
-def generate_next_states(state, max_x, max_y):
-    x, y = state
-    return [
-        (max_x, y),  # Fill jug X
-        (x, max_y),  # Fill jug Y
-        (0, y),      # Empty jug X
-        (x, 0),      # Empty jug Y
-        (x - min(x, max_y - y), y + min(x, max_y - y)),  # Pour X -> Y
-        (x + min(y, max_x - x), y - min(y, max_x - x))   # Pour Y -> X
-    ]
-
-def calculate_tree_positions(graph, root, width=1., vert_gap=0.4, vert_loc=0, xcenter=0.5,
-                           pos=None, parent=None, visited=None):
-    if pos is None:
-        pos = {root: (xcenter, vert_loc)}
-    else:
-        pos[root] = (xcenter, vert_loc)
-    if visited is None:
-        visited = set()
-        
-    visited.add(root)
-    children = [n for n in graph.neighbors(root) if n not in visited]
-    if len(children) != 0:
-        dx = width / len(children)
-        nextx = xcenter - width/2 - dx/2
-        for child in children:
-            nextx += dx
-            pos = calculate_tree_positions(graph, child, width=dx, vert_gap=vert_gap,
-                                        vert_loc=vert_loc-vert_gap, xcenter=nextx,
-                                        pos=pos, parent=root, visited=visited)
-    return pos
+from jug_search import JugSearch
+from jug_math import is_measurable
 
 def draw_tree(graph, path=None):
     plt.figure(figsize=(15, 10))
     
-    # Calculate positions based on tree structure
+    # Tidy tree layout; node depths come out of the same O(n) pass
     root = (0, 0)  # Starting state
-    pos = calculate_tree_positions(graph, root, width=2., vert_gap=0.3)
+    pos, depths = tidy_tree_layout(graph, root, dx=1.0, dy=1.0)
     
     # Draw edges
     nx.draw_networkx_edges(graph, pos, edge_color='gray', arrows=True,
                           arrowsize=20, arrowstyle='->', connectionstyle='arc3,rad=0.2')
     
     # Color nodes based on their depth
-    depths = nx.shortest_path_length(graph, root)
     max_depth = max(depths.values())
     node_colors = [plt.cm.viridis(depths[node]/max_depth) for node in graph.nodes()]
     
@@ -78,51 +44,32 @@ def draw_tree(graph, path=None):
     plt.tight_layout()
     plt.show()
 
-def dfs_water_jug(x, y, z):
-    if z > max(x, y):
+def dfs_water_jug(x, y, z, strategy="dfs"):
+    """Solve with plain DFS (strategy="dfs") or iterative deepening ("iddfs")"""
+    # Anything that does not fit or is not a multiple of gcd(x, y) is unreachable
+    if not is_measurable(x, y, z):
         print("Impossible to measure this amount.")
         return
     
-    stack = [(0, 0)]
-    visited = set()
-    parent = {}
-    graph = nx.DiGraph()
-    
-    # Initialize the starting node
-    graph.add_node((0, 0))
+    # Same dense-array engine as the BFS solver, driven with a stack
+    search = JugSearch(x, y)
+    goal = search.iddfs(z) if strategy == "iddfs" else search.dfs(z)
+    graph = search.to_graph()
     
-    while stack:
-        state = stack.pop()
+    if goal != -1:
+        path = search.path(goal)
         
-        if state not in visited:
-            visited.add(state)
-            
-            if is_goal_state(state, z):
-                path = []
-                current = state
-                while current is not None:
-                    path.append(current)
-                    current = parent.get(current)
-                path = path[::-1]
-                
-                print("\nSolution path (DFS):", path)
-                print("\nSteps to solve:")
-                for i in range(len(path)-1):
-                    print(f"Step {i+1}: From {path[i]} to {path[i+1]}")
-                
-                draw_tree(graph, path)
-                return
-            
-            next_states = generate_next_states(state, x, y)
-            for next_state in reversed(next_states):
-                if next_state not in visited:
-                    stack.append(next_state)
-                    if next_state not in parent:  # Only add edge if not already in tree
-                        parent[next_state] = state
-                        graph.add_node(next_state)
-                        graph.add_edge(state, next_state)
+        print("\nSolution path (DFS):", path)
+        print("Nodes expanded:", search.nodes_expanded)
+        print("\nSteps to solve:")
+        for i in range(len(path)-1):
+            print(f"Step {i+1}: From {path[i]} to {path[i+1]}")
+        
+        draw_tree(graph, path)
+        return
     
     print("No solution found (DFS).")
+    print("Nodes expanded:", search.nodes_expanded)
     draw_tree(graph)
 
 def main():
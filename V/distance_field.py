@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+import numpy as np
+from grid_search import GridMap, Cell
+
+UNREACHED = -1
+WIDE = 256  # Levels this large go to the packed wavefront
+NARROW = 64  # ... which hands back after NARROW_STEPS steps in a row adding fewer cells
+NARROW_STEPS = 8
+
+def wavefront(grid_map: GridMap, goal: Cell) -> np.ndarray:
+    """Distance from every cell to goal, as an int32 array indexed like grid_map's flat cells.
+
+    A breadth-first search that switches between two engines by frontier
+    width. Narrow levels (corridors, the first steps around the goal) are
+    expanded cell by cell from a list; once a level holds WIDE cells the
+    search moves to _packed_wavefront, which advances whole levels with a
+    few array operations, and it comes back when the frontier stays
+    narrow. A serpentine corridor therefore costs a plain BFS, not one
+    round of array calls per cell of its length. Unreachable and blocked
+    cells are UNREACHED.
+    """
+    free = grid_map.blocked.reshape(-1, grid_map.width) == 0
+    dist = np.full(free.shape, UNREACHED, dtype=np.int32)
+    if not grid_map.free(goal):
+        return dist.ravel()
+    flat = dist.reshape(-1)
+    level = [grid_map.index(goal)]
+    flat[level[0]] = 0
+    step = 0
+    while level:
+        if len(level) >= WIDE:
+            level, step = _packed_wavefront(free, dist, level, step)
+        else:
+            level, step = _scalar_wavefront(grid_map, flat, level, step)
+    return flat
+
+def _scalar_wavefront(grid_map: GridMap, flat: np.ndarray, level: List[int], step: int):
+    """BFS level by level from level (cells at distance step) until a level reaches WIDE cells"""
+    blocked, distance, offsets = memoryview(grid_map.blocked), memoryview(flat), grid_map.offsets
+    while level and len(level) < WIDE:
+        step += 1
+        following = []
+        for index in level:
+            for offset in offsets:
+                neighbor = index + offset
+                if distance[neighbor] == UNREACHED and not blocked[neighbor]:
+                    distance[neighbor] = step
+                    following.append(neighbor)
+        level = following
+    return level, step
+
+def _packed_wavefront(free: np.ndarray, dist: np.ndarray, level: List[int], step: int):
+    """Advance whole levels on boolean arrays packed 64 cells to a word.
+
+    Each step ORs the four one-cell shifts of the frontier (whole rows up
+    and down, bit shifts with carries left and right), masks out blocked
+    and already reached cells, and stamps the step number on the new
+    frontier. Only the rows of the frontier's bounding box grown by one are
+    touched per step. Returns the last level as flat indices once fewer than
+    NARROW cells have been added for NARROW_STEPS steps in a row, or an
+    empty list when the search is done.
+    """
+    height, width = free.shape
+    words = -(-width // 64)
+    padded = np.zeros((height, words * 64), dtype=bool)
+    padded[:, :width] = free & (dist == UNREACHED)
+    unvisited = np.packbits(padded, axis=1, bitorder='little').view('<u8')
+    padded[:] = False
+    rows, cols = np.divmod(np.array(level), width)
+    padded[rows, cols] = True
+    frontier = np.packbits(padded, axis=1, bitorder='little').view('<u8')
+    bits = np.arange(64, dtype=np.uint64)
+    one, sixty_three = np.uint64(1), np.uint64(63)
+    top, bottom = rows.min(), rows.max() + 1  # Frontier rows, half-open
+    narrow = 0
+    while True:
+        t, b = max(top - 1, 0), min(bottom + 1, height)
+        window = frontier[t:b]
+        grown = window << one  # Towards higher columns, carrying across words
+        grown[:, 1:] |= window[:, :-1] >> sixty_three
+        towards_left = window >> one
+        towards_left[:, :-1] |= window[:, 1:] << sixty_three
+        grown |= towards_left
+        grown[1:] |= window[:-1]
+        grown[:-1] |= window[1:]
+        grown &= unvisited[t:b]
+        rows, cols = np.nonzero(grown)
+        if not rows.size:
+            return [], step
+        step += 1
+        # Unpack only the words that hold new cells
+        hit = (grown[rows, cols][:, None] >> bits) & one
+        which, bit = np.nonzero(hit)
+        new_rows, new_cols = t + rows[which], cols[which] * 64 + bit.astype(np.int64)
+        dist[new_rows, new_cols] = step
+        narrow = narrow + 1 if which.size < NARROW else 0
+        if narrow >= NARROW_STEPS:
+            return (new_rows * width + new_cols).tolist(), step
+        unvisited[t:b] &= ~grown
+        frontier[t:b] = grown  # The old frontier lies inside the window, so this replaces it
+        top, bottom = t + rows[0], t + rows[-1] + 1
+
+def descend(grid_map: GridMap, field: np.ndarray, start: Cell) -> Optional[List[Cell]]:
+    """Shortest path from start to the field's goal by stepping downhill, O(path length)"""
+    if not grid_map.free(start):
+        return None
+    distance = memoryview(field)
+    index = grid_map.index(start)
+    d = distance[index]
+    if d == UNREACHED:
+        return None
+    path = [start]
+    while d:
+        for offset in grid_map.offsets:
+            if distance[index + offset] == d - 1:
+                index += offset
+                break
+        d -= 1
+        path.append(grid_map.cell(index))
+    return path
+
+class DistanceFieldCache:
+    """Goal distance fields kept per (map_id, version, goal), least recently used first out.
+
+    One wavefront answers every start routing to the same goal: field()
+    builds it on first use, path() reads a shortest path off it by
+    descend(). Entries for an older map version are never served again;
+    evict() and evict_stale() drop them explicitly, and at most max_fields
+    fields are kept.
+    """
+
+    def __init__(self, max_fields: int = 8):
+        self.max_fields = max_fields
+        self.fields: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def field(self, grid_map: GridMap, goal: Cell) -> np.ndarray:
+        key = (grid_map.map_id, grid_map.version, tuple(goal))
+        field = self.fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return field
+        self.misses += 1
+        field = self.fields[key] = wavefront(grid_map, goal)
+        while len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+    def path(self, grid_map: GridMap, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        return descend(grid_map, self.field(grid_map, goal), start)
+
+    def distance(self, grid_map: GridMap, start: Cell, goal: Cell) -> Optional[int]:
+        if not grid_map.free(start):
+            return None
+        d = int(self.field(grid_map, goal)[grid_map.index(start)])
+        return None if d == UNREACHED else d
+
+    def evict(self, grid_map: GridMap = None, goals: Sequence[Cell] = None) -> int:
+        """Drop the fields of grid_map (every version) and/or of the given goals; returns how many"""
+        goals = None if goals is None else {tuple(goal) for goal in goals}
+        doomed = [key for key in self.fields
+                  if (grid_map is None or key[0] == grid_map.map_id) and (goals is None or key[2] in goals)]
+        for key in doomed:
+            del self.fields[key]
+        return len(doomed)
+
+    def evict_stale(self, grid_map: GridMap) -> int:
+        """Drop the fields of grid_map built for a version other than its current one"""
+        doomed = [key for key in self.fields if key[0] == grid_map.map_id and key[1] != grid_map.version]
+        for key in doomed:
+            del self.fields[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        self.fields.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(field.nbytes for field in self.fields.values())
@@ -0,0 +1,100 @@
+import os
+from functools import lru_cache
+from typing import List, Optional, Sequence
+import numpy as np
+from pattern_db import CACHE_DIR, UNSEEN, rank_placement, rank_placements, write_table
+from puzzle_state import PackedState, solvable
+
+STATES = 181440  # 9! / 2, one parity class of the 8-puzzle
+
+def state_rank(tiles: Sequence[int]) -> int:
+    """Perfect hash of an 8-puzzle board within its parity class.
+
+    The cells of the blank and tiles 1..6 are ranked as a partial
+    permutation (Lehmer code) of 7 out of 9 cells. Swapping the last two
+    tiles is a single transposition with the blank fixed, which flips the
+    parity class, so the rank is a bijection onto 0 .. 181439.
+    """
+    where = [0] * 9
+    for pos, tile in enumerate(tiles):
+        where[tile] = pos
+    return rank_placement(where[:7], 9)
+
+def build_distance_table(goal: Sequence[int]) -> np.ndarray:
+    """Exact distance to goal of every state in the goal's parity class.
+
+    Level-synchronous BFS from the goal with whole levels held as (m, 9)
+    boards; distances fit in a byte since no state is more than 31 moves out.
+    """
+    table = np.full(STATES, UNSEEN, dtype=np.uint8)
+    frontier = np.array([goal], dtype=np.int8)
+    table[state_rank(goal)] = 0
+    depth = 0
+    while frontier.size:
+        blank = np.argmax(frontier == 0, axis=1)
+        children = []
+        for delta, legal in ((-3, blank >= 3), (3, blank < 6), (-1, blank % 3 > 0), (1, blank % 3 < 2)):
+            child = frontier[legal].copy()
+            r, b = np.arange(len(child)), blank[legal]
+            child[r, b] = child[r, b + delta]
+            child[r, b + delta] = 0
+            children.append(child)
+        candidates = np.concatenate(children)
+        where = np.argsort(candidates, axis=1)  # Inverse permutation: tile -> cell
+        ranks, first = np.unique(rank_placements(where[:, :7], 9), return_index=True)
+        fresh = table[ranks] == UNSEEN
+        depth += 1
+        table[ranks[fresh]] = depth
+        frontier = candidates[first[fresh]]
+    return table
+
+def table_path(goal: Sequence[int], directory: str = None) -> str:
+    return os.path.join(directory or CACHE_DIR, f"dist_3x3_{'-'.join(map(str, goal))}.bin")
+
+class DistanceTable:
+    """Exact distances to one 8-puzzle goal, stored one byte per state.
+
+    The table is built by a single BFS the first time a goal is used and
+    saved to search_cache, so later runs just read 181,440 bytes; a file of
+    the wrong size or with unreached states is rebuilt. It also
+    works as a perfect heuristic (evaluate/update) for the other solvers.
+    """
+
+    def __init__(self, goal: Sequence[int], directory: str = None):
+        self.goal = tuple(int(t) for t in goal)
+        self.goal_state = PackedState.from_tiles(self.goal, 3)
+        path = table_path(self.goal, directory)
+        self.table = np.fromfile(path, dtype=np.uint8) if os.path.exists(path) else None
+        # A truncated or foreign file would be an inadmissible heuristic, so rebuild it
+        if self.table is None or self.table.size != STATES or (self.table == UNSEEN).any():
+            self.table = build_distance_table(self.goal)
+            write_table(path, self.table)
+
+    def distance(self, state: PackedState) -> Optional[int]:
+        """Optimal number of moves to the goal, None if it is unreachable"""
+        if not solvable(state, self.goal_state):
+            return None
+        return int(self.table[state_rank(state.tiles())])
+
+    def evaluate(self, state: PackedState) -> int:
+        return int(self.table[state_rank(state.tiles())])
+
+    def update(self, parent: PackedState, h: int, child: PackedState) -> int:
+        return self.evaluate(child)
+
+    def solve(self, start: PackedState) -> Optional[List[PackedState]]:
+        """Optimal path by greedy descent: always step to a neighbour one move closer"""
+        d = self.distance(start)
+        if d is None:
+            return None
+        path = [start]
+        while d:
+            start = next(s for s in start.neighbors() if self.evaluate(s) == d - 1)
+            path.append(start)
+            d -= 1
+        return path
+
+@lru_cache(maxsize=8)
+def distance_table(goal: Sequence[int]) -> DistanceTable:
+    """One table per goal per process"""
+    return DistanceTable(goal)
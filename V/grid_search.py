@@ -0,0 +1,329 @@
+from itertools import count
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from bucket_queue import BucketQueue
+
+Cell = Tuple[int, int]
+UNSEEN = -1
+_map_ids = count()
+
+class GridMap:
+    """4-connected occupancy grid stored as flat cell indices.
+
+    The grid is padded with a border of obstacles, so a neighbour is simply
+    index + offset with no bounds checks, and the four offsets are computed
+    once. g-values and parents are int32 NumPy arrays of one entry per
+    cell; the search loop reads them through memoryviews, which hand back
+    plain Python ints. Open-list entries are bare cell indices and the path
+    is only rebuilt from the parent array once the goal is reached.
+
+    map_id and version identify the map contents: set_blocked() bumps the
+    version, so caches keyed on (map_id, version) never serve a stale map.
+    """
+
+    def __init__(self, grid):
+        blocked = np.asarray(grid) != 0  # Nonzero cells are obstacles
+        rows, cols = blocked.shape
+        padded = np.ones((rows + 2, cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = blocked
+        self._attach(padded.ravel(), rows, cols)
+
+    @classmethod
+    def from_padded(cls, blocked: np.ndarray, rows: int, cols: int) -> 'GridMap':
+        """GridMap over an existing flat padded uint8 array (e.g. in shared memory), without copying it"""
+        if blocked.shape != ((rows + 2) * (cols + 2),) or blocked.dtype != np.uint8:
+            raise ValueError("blocked must be a flat uint8 array of (rows + 2) * (cols + 2) cells")
+        grid_map = cls.__new__(cls)
+        grid_map._attach(blocked, rows, cols)
+        return grid_map
+
+    def _attach(self, blocked: np.ndarray, rows: int, cols: int) -> None:
+        self.rows, self.cols = rows, cols
+        self.width = cols + 2
+        self.blocked = blocked
+        self.size = blocked.size
+        self.offsets = (-self.width, self.width, -1, 1)  # Up, down, left, right
+        self._jump_table = None
+        self.map_id = next(_map_ids)
+        self.version = 0
+
+    def detach(self) -> None:
+        """Move onto a private copy of the cells (e.g. before their shared buffer goes away).
+
+        The contents are unchanged, so map_id, version and the jump table stay valid.
+        """
+        self.blocked = self.blocked.copy()
+
+    def set_blocked(self, cells: Iterable[Cell], blocked: bool = True) -> List[Cell]:
+        """Block (or free) cells; returns the cells that actually changed"""
+        changed = []
+        for cell in cells:
+            if not (0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols):
+                raise ValueError(f"Cell {cell} is outside the grid")
+            index = self.index(cell)
+            if bool(self.blocked[index]) != blocked:
+                self.blocked[index] = blocked
+                changed.append(cell)
+        if changed:
+            self.version += 1
+            self._jump_table = None
+        return changed
+
+    def index(self, cell: Cell) -> int:
+        return (cell[0] + 1) * self.width + cell[1] + 1
+
+    def cell(self, index: int) -> Cell:
+        r, c = divmod(index, self.width)
+        return r - 1, c - 1
+
+    def free(self, cell: Cell) -> bool:
+        r, c = cell
+        return 0 <= r < self.rows and 0 <= c < self.cols and not self.blocked[self.index(cell)]
+
+    def path_to(self, parent, index: int) -> List[Cell]:
+        """Cells from the search root to index, following a parent array"""
+        path = []
+        while index != UNSEEN:
+            path.append(self.cell(index))
+            index = parent[index]
+        return path[::-1]
+
+    def a_star(self, start: Cell, goal: Cell, stats: Dict[str, int] = None,
+               on_expand: Callable = None) -> Optional[List[Cell]]:
+        """Shortest 4-connected path from start to goal (A* with Manhattan distance), or None"""
+        return self._search(start, goal, True, stats, on_expand)
+
+    def best_first(self, start: Cell, goal: Cell, stats: Dict[str, int] = None,
+                   on_expand: Callable = None) -> Optional[List[Cell]]:
+        """Greedy best-first path ordered by Manhattan distance alone; not necessarily shortest"""
+        return self._search(start, goal, False, stats, on_expand)
+
+    def _search(self, start, goal, use_g, stats, on_expand):
+        stats = {} if stats is None else stats
+        stats.update(nodes_expanded=0, peak_frontier=1)
+        if not (self.free(start) and self.free(goal)):
+            return None
+        width = self.width
+        blocked = memoryview(self.blocked)
+        g_array = np.full(self.size, UNSEEN, dtype=np.int32)
+        parent_array = np.full(self.size, UNSEEN, dtype=np.int32)
+        g = memoryview(g_array)
+        parent = memoryview(parent_array)
+        closed = bytearray(self.size)
+        offsets = self.offsets
+        source, target = self.index(start), self.index(goal)
+        goal_row, goal_col = divmod(target, width)
+
+        # Integer f-values; A* breaks ties towards the deepest node, greedy search towards the newest
+        open_list = BucketQueue('high_g' if use_g else 'lifo')
+        g[source] = 0
+        open_list.push(abs(source // width - goal_row) + abs(source % width - goal_col), source, 0)
+        expanded = 0
+        peak = 1
+        while open_list:
+            _, current = open_list.pop()
+            if closed[current]:
+                continue  # Reached again with a lower g after being queued
+            if current == target:
+                stats.update(nodes_expanded=expanded, peak_frontier=peak)
+                return self.path_to(parent, current)
+            closed[current] = 1
+            expanded += 1
+            if on_expand is not None:
+                on_expand(current, parent)
+            new_g = g[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if blocked[neighbor] or closed[neighbor]:
+                    continue
+                old_g = g[neighbor]
+                if old_g != UNSEEN and (old_g <= new_g or not use_g):
+                    continue
+                g[neighbor] = new_g
+                parent[neighbor] = current
+                h = abs(neighbor // width - goal_row) + abs(neighbor % width - goal_col)
+                if use_g:
+                    open_list.push(new_g + h, neighbor, new_g)
+                else:
+                    open_list.push(h, neighbor)
+            if len(open_list) > peak:
+                peak = len(open_list)
+        stats.update(nodes_expanded=expanded, peak_frontier=peak)
+        return None
+
+    def jump_point_search(self, start: Cell, goal: Cell, stats: Dict[str, int] = None,
+                          precomputed: bool = False) -> Optional[List[Cell]]:
+        """Shortest 4-connected path by Jump Point Search, or None.
+
+        A* runs over jump points only: a horizontal jump stops where a cell
+        above or below opens up beside a wall behind it (a forced neighbour),
+        a vertical jump also stops where a horizontal jump from it would
+        stop, and both stop at the goal. Successors are pruned to straight
+        on and the two perpendicular directions, so the many symmetric paths
+        across open areas are never expanded. nodes_expanded counts jump
+        points; the returned path lists every cell.
+
+        With precomputed=True the jumps are read from the JPS+ table of
+        jump_table() instead of being scanned cell by cell, which matters on
+        large open maps where a vertical scan checks a whole row per step.
+        """
+        stats = {} if stats is None else stats
+        stats.update(nodes_expanded=0, peak_frontier=1)
+        if not (self.free(start) and self.free(goal)):
+            return None
+        jump = self._table_jump if precomputed else self._scan_jump
+        table = self.jump_table() if precomputed else None
+        width = self.width
+        g_array = np.full(self.size, UNSEEN, dtype=np.int32)
+        parent_array = np.full(self.size, UNSEEN, dtype=np.int32)
+        g = memoryview(g_array)
+        parent = memoryview(parent_array)
+        closed = bytearray(self.size)
+        source, target = self.index(start), self.index(goal)
+        goal_row, goal_col = divmod(target, width)
+
+        open_list = BucketQueue('high_g')
+        g[source] = 0
+        open_list.push(abs(source // width - goal_row) + abs(source % width - goal_col), source, 0)
+        expanded = 0
+        peak = 1
+        while open_list:
+            _, current = open_list.pop()
+            if closed[current]:
+                continue
+            if current == target:
+                stats.update(nodes_expanded=expanded, peak_frontier=peak)
+                points = self.path_to(parent, current)
+                path = [points[0]]
+                for (r0, c0), (r1, c1) in zip(points, points[1:]):
+                    dr, dc = (r1 > r0) - (r1 < r0), (c1 > c0) - (c1 < c0)
+                    path.extend((r0 + dr * k, c0 + dc * k) for k in range(1, abs(r1 - r0) + abs(c1 - c0) + 1))
+                return path
+            closed[current] = 1
+            expanded += 1
+            for step in self._directions(parent[current], current):
+                landing = jump(current, step, target, table)
+                if landing == UNSEEN or closed[landing]:
+                    continue
+                new_g = g[current] + abs(landing // width - current // width) + abs(landing % width - current % width)
+                old_g = g[landing]
+                if old_g != UNSEEN and old_g <= new_g:
+                    continue
+                g[landing] = new_g
+                parent[landing] = current
+                h = abs(landing // width - goal_row) + abs(landing % width - goal_col)
+                open_list.push(new_g + h, landing, new_g)
+            if len(open_list) > peak:
+                peak = len(open_list)
+        stats.update(nodes_expanded=expanded, peak_frontier=peak)
+        return None
+
+    def _directions(self, parent: int, current: int) -> Tuple[int, ...]:
+        """Steps worth jumping in: all four from the start, else straight on and sideways"""
+        if parent == UNSEEN:
+            return self.offsets
+        delta = current - parent
+        if -self.width < delta < self.width:
+            step = 1 if delta > 0 else -1
+            return step, -self.width, self.width
+        step = self.width if delta > 0 else -self.width
+        return step, -1, 1
+
+    def _scan_jump(self, cell: int, step: int, target: int, table=None) -> int:
+        """Cell where a jump from cell in direction step stops, or UNSEEN at a wall"""
+        blocked = self.blocked
+        if step == 1 or step == -1:
+            sides = (-self.width, self.width)
+            while True:
+                cell += step
+                if blocked[cell]:
+                    return UNSEEN
+                if cell == target:
+                    return cell
+                for side in sides:
+                    if not blocked[cell + side] and blocked[cell - step + side]:
+                        return cell
+        while True:
+            cell += step
+            if blocked[cell]:
+                return UNSEEN
+            if cell == target:
+                return cell
+            for side in (-1, 1):
+                if not blocked[cell + side] and blocked[cell - step + side]:
+                    return cell
+            if self._scan_jump(cell, 1, target) != UNSEEN or self._scan_jump(cell, -1, target) != UNSEEN:
+                return cell
+
+    def _table_jump(self, cell: int, step: int, target: int, table) -> int:
+        """_scan_jump answered from the JPS+ table, adding the stops the goal causes"""
+        width = self.width
+        distance = int(table[self.offsets.index(step)][cell])
+        reach = distance if distance > 0 else -distance
+        row, col = divmod(cell, width)
+        goal_row, goal_col = divmod(target, width)
+        if step == 1 or step == -1:
+            ahead = (goal_col - col) * step
+            if goal_row == row and 0 < ahead <= reach:
+                return target
+            return cell + distance * step if distance > 0 else UNSEEN
+        ahead = (goal_row - row) * (1 if step > 0 else -1)
+        if 0 < ahead <= reach and (distance <= 0 or ahead < distance):
+            if goal_col == col:
+                return target
+            # A horizontal jump from the goal's row would reach the goal across open cells
+            crossing = cell + ahead * step
+            sideways = 1 if goal_col > col else -1
+            run = int(table[self.offsets.index(sideways)][crossing])
+            if run <= 0 and -run >= abs(goal_col - col):
+                return crossing
+        return cell + distance * step if distance > 0 else UNSEEN
+
+    def jump_table(self) -> Tuple[np.ndarray, ...]:
+        """JPS+ table: per direction (up, down, left, right), an int32 array over the cells.
+
+        A positive entry is the distance to the jump point a jump from that
+        cell stops at, otherwise minus the number of free cells before the
+        wall. Goal stops are added at query time. Built once per grid with
+        array shifts and running minima, and kept on the instance.
+        """
+        if self._jump_table is not None:
+            return self._jump_table
+        blocked = self.blocked.reshape(-1, self.width).astype(bool)
+        free = ~blocked
+        # Out-of-grid neighbours of the border count as blocked
+        b = np.pad(blocked, 1, constant_values=True)
+        f = ~b
+
+        def shifted(array, dr, dc):
+            """array[r + dr, c + dc] for every cell of the padded grid"""
+            rows, cols = blocked.shape
+            return array[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+
+        forced = {
+            1: free & ((shifted(f, -1, 0) & shifted(b, -1, -1)) | (shifted(f, 1, 0) & shifted(b, 1, -1))),
+            -1: free & ((shifted(f, -1, 0) & shifted(b, -1, 1)) | (shifted(f, 1, 0) & shifted(b, 1, 1))),
+            'down': free & ((shifted(f, 0, -1) & shifted(b, -1, -1)) | (shifted(f, 0, 1) & shifted(b, -1, 1))),
+            'up': free & ((shifted(f, 0, -1) & shifted(b, 1, -1)) | (shifted(f, 0, 1) & shifted(b, 1, 1))),
+        }
+        right = _jump_distances(forced[1], blocked)
+        left = _jump_distances(forced[-1][:, ::-1], blocked[:, ::-1])[:, ::-1]
+        stops = free & ((right > 0) | (left > 0))
+        down = _jump_distances((forced['down'] | stops).T, blocked.T).T
+        up = _jump_distances((forced['up'] | stops)[::-1].T, blocked[::-1].T).T[::-1]
+        self._jump_table = tuple(np.where(free, table, 0).astype(np.int32).ravel() for table in (up, down, left, right))
+        return self._jump_table
+
+def _jump_distances(events: np.ndarray, blocked: np.ndarray) -> np.ndarray:
+    """Per cell, the distance along each row to the next event cell to the right,
+    or minus the number of free cells before the next blocked one"""
+    cols = events.shape[1]
+    position = np.arange(cols)
+    marker = np.where(events | blocked, position, cols)
+    first = np.minimum.accumulate(marker[:, ::-1], axis=1)[:, ::-1]  # First event or wall at or after c
+    following = np.empty_like(first)
+    following[:, :-1] = first[:, 1:]
+    following[:, -1] = cols
+    distance = following - position
+    at_wall = np.take_along_axis(blocked, np.minimum(following, cols - 1), axis=1)
+    return np.where(at_wall | (following == cols), 1 - distance, distance)
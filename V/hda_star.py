@@ -0,0 +1,218 @@
+import multiprocessing as mp
+import queue
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from bucket_queue import BucketQueue
+from puzzle_heuristics import heuristic_table
+from puzzle_state import PackedState, adjacent, solvable
+
+NO_SOLUTION = 1 << 30
+RESULT_POLL = 0.5  # Seconds between worker liveness checks while waiting for a result
+
+def owner(code: int, workers: int) -> int:
+    """Worker that owns a state: Fibonacci hashing of the packed board"""
+    return (((code * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+
+def _worker(rank, workers, goal, size, kind, inboxes, results, incumbent, idle, sent, received, batch):
+    """One HDA* worker: owns the states that hash to rank and expands them in f order.
+
+    Node messages are lists of (code, blank, g, h, parent_code, parent_blank).
+    Control messages: ('parent', code) asks for a stored parent pointer,
+    ('stop',) ends the worker after it reports its counters.
+    """
+    table = heuristic_table(goal, size, kind)
+    goal_code = PackedState.from_tiles(goal, size).code
+    adj = adjacent(size)
+    inbox = inboxes[rank]
+    open_list = BucketQueue('high_g')
+    g_scores: Dict[int, int] = {}
+    parents: Dict[int, Tuple[int, int]] = {}
+    outgoing: List[list] = [[] for _ in range(workers)]
+    expanded = 0
+
+    def flush():
+        for target, buffer in enumerate(outgoing):
+            if buffer:
+                sent[rank] += len(buffer)  # Counted before it can be received
+                inboxes[target].put(buffer)
+                outgoing[target] = []
+
+    def add(code, blank, g, h, parent_code, parent_blank):
+        if g < g_scores.get(code, NO_SOLUTION):
+            g_scores[code] = g
+            parents[code] = (parent_code, parent_blank)
+            open_list.push(g + h, (g, h, code, blank), g)
+
+    def receive(message):
+        if message[0] == 'parent':
+            results.put(('parent', message[1], parents.get(message[1])))
+            return True
+        if message[0] == 'stop':
+            results.put(('stats', rank, expanded, len(g_scores)))
+            return False
+        for node in message:
+            add(*node)
+        received[rank] += len(message)
+        return True
+
+    while True:
+        try:
+            message = inbox.get_nowait()
+        except queue.Empty:
+            message = None
+        if message is not None:
+            idle[rank] = 0
+            if not receive(message):
+                return
+            continue
+
+        # Expand while something here can still beat the incumbent
+        worked = False
+        while open_list and open_list.min_key() < incumbent.value:
+            _, (g, h, code, blank) = open_list.pop()
+            if g != g_scores[code]:
+                continue  # Reached again with a lower g after being queued
+            worked = True
+            expanded += 1
+            if code == goal_code:
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                continue
+            parent = PackedState(code, blank, size)
+            for pos in adj[blank]:
+                child = parent.move(pos)
+                if child.code == parents[code][0]:
+                    continue  # Straight back to the parent
+                child_h = table.update(parent, h, child)
+                target = owner(child.code, workers)
+                if target == rank:
+                    add(child.code, pos, g + 1, child_h, code, blank)  # Own states skip the queues
+                else:
+                    outgoing[target].append((child.code, pos, g + 1, child_h, code, blank))
+            if expanded % batch == 0:
+                break  # Go back and read the inbox
+        flush()
+        if not worked:
+            idle[rank] = 1
+            try:
+                message = inbox.get(timeout=0.005)
+            except queue.Empty:
+                continue
+            idle[rank] = 0
+            if not receive(message):
+                return
+
+class HDAStar:
+    """Hash-distributed A* (Kishimoto, Fukunaga and Botea) over worker processes.
+
+    Every state is owned by one worker, chosen by a hash of its packed
+    code. Each worker keeps its own open list and g-values, expands its
+    states in f order and routes successors to their owners in batches
+    over multiprocessing queues. When a worker expands the goal it lowers
+    a shared incumbent cost, and workers only expand nodes with f below
+    it. The search ends when every worker is idle with nothing below the
+    incumbent and every node message sent has been received, checked
+    twice in a row, so the incumbent is optimal for an admissible
+    heuristic. If a worker process dies before it has reported, search()
+    stops the others and raises RuntimeError instead of waiting forever.
+    """
+
+    def __init__(self, start: Sequence[int], goal: Sequence[int], size: int = None,
+                 heuristic_kind: str = 'manhattan', workers: int = 4, batch: int = 64):
+        self.start = PackedState.from_tiles(start, size)
+        self.goal = PackedState.from_tiles(goal, size)
+        self.size = self.start.size
+        self.goal_tiles = tuple(int(t) for t in goal)
+        self.heuristic_kind = heuristic_kind
+        self.workers = workers
+        self.batch = batch
+        self.nodes_expanded = 0
+        self.expanded_per_worker: List[int] = []
+        self.elapsed = 0.0
+
+    def search(self) -> Optional[List[PackedState]]:
+        """Optimal path from start to goal, or None if the goal is unreachable"""
+        began = time.perf_counter()
+        try:
+            if not solvable(self.start, self.goal):
+                return None
+            return self._search()
+        finally:
+            self.elapsed = time.perf_counter() - began
+
+    def _search(self) -> List[PackedState]:
+        workers = self.workers
+        inboxes = [mp.Queue() for _ in range(workers)]
+        results = mp.Queue()
+        incumbent = mp.Value('q', NO_SOLUTION)
+        idle = mp.Array('b', workers, lock=False)
+        sent = mp.Array('q', workers, lock=False)
+        received = mp.Array('q', workers, lock=False)
+        processes = [mp.Process(target=_worker, daemon=True,
+                                args=(rank, workers, self.goal_tiles, self.size, self.heuristic_kind,
+                                      inboxes, results, incumbent, idle, sent, received, self.batch))
+                     for rank in range(workers)]
+        for process in processes:
+            process.start()
+
+        try:
+            table = heuristic_table(self.goal_tiles, self.size, self.heuristic_kind)
+            start = self.start
+            sent[0] += 1  # Counted against the first worker as if it sent the root
+            inboxes[owner(start.code, workers)].put([(start.code, start.blank, 0, table.evaluate(start), -1, -1)])
+            path = self._collect(start, inboxes, results, idle, sent, received, processes)
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join(1.0)
+            raise
+        for process in processes:
+            process.join()
+        return path
+
+    def _collect(self, start, inboxes, results, idle, sent, received, processes) -> List[PackedState]:
+        """Wait for termination, rebuild the path and gather the counters; fails if a worker dies"""
+        workers = self.workers
+        pending = set(range(workers))  # Workers that have not reported their counters yet
+
+        def check_workers():
+            for rank in pending:
+                if not processes[rank].is_alive():
+                    raise RuntimeError(f"HDA* worker {rank} exited early (exit code {processes[rank].exitcode})")
+
+        def result():
+            while True:
+                try:
+                    return results.get(timeout=RESULT_POLL)
+                except queue.Empty:
+                    check_workers()
+
+        previous = None
+        while True:
+            time.sleep(0.002)
+            check_workers()
+            snapshot = (tuple(idle), sum(sent), sum(received))
+            done = all(snapshot[0]) and snapshot[1] == snapshot[2]
+            if done and snapshot == previous:
+                break
+            previous = snapshot if done else None
+
+        # Walk the parent pointers back from the goal, asking each state's owner
+        path = [self.goal]
+        code, blank = self.goal.code, self.goal.blank
+        while code != start.code:
+            inboxes[owner(code, workers)].put(('parent', code))
+            _, _, (code, blank) = result()
+            path.append(PackedState(code, blank, self.size))
+
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        self.expanded_per_worker = [0] * workers
+        for _ in range(workers):
+            _, rank, expanded, _ = result()
+            pending.discard(rank)  # The worker exits after this message
+            self.expanded_per_worker[rank] = expanded
+        self.nodes_expanded = sum(self.expanded_per_worker)
+        return path[::-1]
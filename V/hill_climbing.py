@@ -1,115 +1,82 @@
+import math
+import random
 import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import Tuple, List, Dict, Optional, NamedTuple
+from typing import Tuple, List, Dict, Optional, Sequence
 from collections import defaultdict
-
-class PuzzleState(NamedTuple):
-    board: Tuple[Tuple[int, ...], ...]
-    empty_pos: Tuple[int, int]
-
-    @classmethod
-    def from_array(cls, array: np.ndarray) -> 'PuzzleState':
-        empty_i, empty_j = np.where(array == 0)
-        empty_pos = (int(empty_i[0]), int(empty_j[0]))
-        return cls(tuple(map(tuple, array)), empty_pos)
-
-    def to_array(self) -> np.ndarray:
-        return np.array(self.board)
-
-class TreeNode:
-    def __init__(self, state: PuzzleState, parent: Optional[int], heuristic: int):
-        self.state = state
-        self.parent = parent
-        self.heuristic = heuristic
-        self.left_child = None
-        self.right_child = None
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from puzzle_state import PackedState, solvable
+from puzzle_heuristics import heuristic_table
+from node_store import NodeStore
 
 class PuzzleHillClimbing:
     def __init__(self, root_state: np.ndarray, goal_state: np.ndarray):
         self.goal_state = goal_state
-        self.goal_state_tuple = tuple(map(tuple, goal_state))
-        self.goal_positions = {
-            goal_state[i, j]: (i, j) 
-            for i in range(3) for j in range(3) if goal_state[i, j] != 0
-        }
-        root = PuzzleState.from_array(root_state)
-        self.nodes: Dict[int, TreeNode] = {
-            0: TreeNode(state=root, parent=None, heuristic=self._manhattan_distance(root))
-        }
-        self.edges: List[Tuple[int, int]] = []
+        self.goal_packed = PackedState.from_array(goal_state)
+        # Manhattan costs per (tile, position); children are scored incrementally
+        self.table = heuristic_table(tuple(goal_state.flatten().tolist()), 3)
+        root = PackedState.from_array(root_state)
+        # Tree nodes are ids into typed columns; the parent and depth columns give the layout
+        self.nodes = NodeStore(3)
+        self.nodes.add(root, h=self._manhattan_distance(root))
         self.visited = {root}
-        self.levels = defaultdict(list)  # Store nodes by level for binary tree layout
-        self.levels[0] = [0]  # Root node at level 0
-
-    def _manhattan_distance(self, state: PuzzleState) -> int:
-        return sum(
-            abs(i - self.goal_positions[val][0]) + abs(j - self.goal_positions[val][1])
-            for i in range(3) for j in range(3) if (val := state.board[i][j]) != 0
-        )
-
-    def _get_valid_moves(self, state: PuzzleState) -> List[PuzzleState]:
-        valid_states = []
-        i, j = state.empty_pos
-        board = np.array(state.board)
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for di, dj in moves:
-            new_i, new_j = i + di, j + dj
-            if 0 <= new_i < 3 and 0 <= new_j < 3:
-                board[i, j], board[new_i, new_j] = board[new_i, new_j], board[i, j]
-                new_state = PuzzleState.from_array(board)
-                if new_state not in self.visited:
-                    valid_states.append(new_state)
-                board[i, j], board[new_i, new_j] = board[new_i, new_j], board[i, j]
-        return valid_states
-
-    def is_goal_state(self, state: PuzzleState) -> bool:
-        return state.board == self.goal_state_tuple
+        self.solution: Optional[List[PackedState]] = None  # Set by solve_restarts
+        self.stats: Dict[str, int] = {}  # Counters of the last solve, read by the benchmark suite
+
+    def _manhattan_distance(self, state: PackedState) -> int:
+        return self.table.evaluate(state)
+
+    def _get_valid_moves(self, state: PackedState) -> List[PackedState]:
+        return [move for move in state.neighbors() if move not in self.visited]
+
+    def is_goal_state(self, state: PackedState) -> bool:
+        return state == self.goal_packed
 
     def solve(self) -> str:
+        """Steepest-ascent hill climbing: expand every unvisited neighbour and move to the best one"""
+        nodes = self.nodes
         current_idx = 0
-        current_level = 0
+        self.stats = {'nodes_expanded': 0, 'peak_frontier': 0, 'solution_length': None}
         
         while True:
-            current_node = self.nodes[current_idx]
-            if current_node.heuristic == 0:
+            current_state = nodes.state(current_idx)
+            current_h = nodes.h[current_idx]
+            if current_h == 0:
+                self.stats['solution_length'] = nodes.depth[current_idx]
                 return "Goal state reached!"
 
-            valid_moves = self._get_valid_moves(current_node.state)
+            valid_moves = self._get_valid_moves(current_state)
             if not valid_moves:
                 return "Stuck at local minimum!"
 
-            # Organize nodes in binary tree format
-            move_count = 0
-            for move in valid_moves[:2]:  # Limit to 2 children for binary tree
-                move_heuristic = self._manhattan_distance(move)
-                new_idx = len(self.nodes)
-                new_node = TreeNode(state=move, parent=current_idx, heuristic=move_heuristic)
-                self.nodes[new_idx] = new_node
-                self.edges.append((current_idx, new_idx))
+            # The children get consecutive ids
+            first_child = len(nodes)
+            for move in valid_moves:
+                move_heuristic = self.table.update(current_state, current_h, move)
+                nodes.add(move, current_idx, h=move_heuristic)
                 self.visited.add(move)
-                
-                # Assign as left or right child
-                if move_count == 0:
-                    self.nodes[current_idx].left_child = new_idx
-                else:
-                    self.nodes[current_idx].right_child = new_idx
-                
-                self.levels[current_level + 1].append(new_idx)
-                move_count += 1
 
-            best_idx = min(
-                (idx for idx in self.nodes if self.nodes[idx].parent == current_idx),
-                key=lambda idx: self.nodes[idx].heuristic, 
-                default=None
-            )
+            self.stats['nodes_expanded'] += 1
+            self.stats['peak_frontier'] = max(self.stats['peak_frontier'], len(valid_moves))
+            best_idx = min(range(first_child, len(nodes)), key=lambda idx: nodes.h[idx])
 
-            if best_idx is None or self.nodes[best_idx].heuristic >= current_node.heuristic:
+            if nodes.h[best_idx] >= current_h:
                 return "Stuck at local minimum!"
             
             current_idx = best_idx
-            current_level += 1
+
+    def solve_restarts(self, attempts: int = 64, strategy: str = 'restart', workers: int = None) -> str:
+        """Run many seeded restart or annealing attempts in parallel; keeps the first solution found"""
+        start = self.nodes.state(0)
+        if not solvable(start, self.goal_packed):
+            self.solution = None
+            return "Goal state is unreachable from this start!"
+        seed, path = parallel_climb(start.tiles(), self.goal_packed.tiles(), strategy, range(attempts), workers)
+        self.solution = path
+        if path is None:
+            return f"No solution in {attempts} attempts!"
+        return f"Goal state reached in {len(path) - 1} moves (seed {seed})!"
 
     def visualize(self) -> None:
         G = nx.Graph()
@@ -117,11 +84,13 @@ class PuzzleHillClimbing:
         node_colors = []
         pos = {}
     
-        # Calculate positions for binary tree layout
-        max_level = max(self.levels.keys())
-        for level in range(max_level + 1):
-            nodes_at_level = self.levels[level]
-            level_width = 2 ** level
+        # Calculate positions for the level-by-level tree layout
+        levels = defaultdict(list)
+        for node_idx in range(len(self.nodes)):
+            levels[self.nodes.depth[node_idx]].append(node_idx)
+        for level in range(max(levels) + 1):
+            nodes_at_level = levels[level]
+            level_width = max(2 ** level, len(nodes_at_level))
             x_spacing = 2.0 / (level_width + 1)  # Increase spacing for better visibility
             
             for i, node_idx in enumerate(nodes_at_level):
@@ -131,31 +100,118 @@ class PuzzleHillClimbing:
                 
                 G.add_node(node_idx)
                 node_labels[node_idx] = "\n".join(" ".join(map(str, row)) 
-                                                    for row in self.nodes[node_idx].state.board)
-                node_colors.append('#90EE90' if self.is_goal_state(self.nodes[node_idx].state) 
+                                                    for row in self.nodes.state(node_idx).to_array())
+                node_colors.append('#90EE90' if self.is_goal_state(self.nodes.state(node_idx)) 
                                    else 'lightblue')
 
-        # Add edges
-        for node_idx in self.nodes:
-            node = self.nodes[node_idx]
-            if node.left_child is not None:
-                G.add_edge(node_idx, node.left_child)
-            if node.right_child is not None:
-                G.add_edge(node_idx, node.right_child)
+        # Add edges from the parent column
+        for node_idx in range(1, len(self.nodes)):
+            G.add_edge(self.nodes.parent[node_idx], node_idx)
 
         plt.figure(figsize=(15, 10))
         nx.draw(G, pos=pos, with_labels=True, labels=node_labels,
                 node_size=2500, node_color=node_colors, font_size=8,
                 edge_color="gray")
-        plt.title("8-Puzzle Binary Tree Search", pad=20)
+        plt.title("8-Puzzle Hill Climbing Search Tree", pad=20)
         
         # Use subplots_adjust for manual adjustments
         plt.subplots_adjust(left=0.1, right=0.9, top=0.9, bottom=0.1)  # Adjust these values as needed
         plt.axis('off')  # Turn off the axis
         plt.show()
 
+def steepest_ascent(start: PackedState, goal: PackedState, table, h: int = None) -> List[PackedState]:
+    """Move to the best neighbour until none improves; returns every state visited"""
+    h = table.evaluate(start) if h is None else h
+    path = [start]
+    while start != goal:
+        best, best_h = None, h
+        for move in start.neighbors():
+            move_h = table.update(start, h, move)
+            if move_h < best_h:
+                best, best_h = move, move_h
+        if best is None:
+            break
+        start, h = best, best_h
+        path.append(start)
+    return path
+
+def random_restarts(start: PackedState, goal: PackedState, table, rng: random.Random,
+                    restarts: int = 200, walk_length: int = 10) -> Optional[List[PackedState]]:
+    """Steepest ascent; whenever it stalls, restart it from the end of a random walk away from the local minimum"""
+    path = steepest_ascent(start, goal, table)
+    for _ in range(restarts):
+        if path[-1] == goal:
+            return erase_loops(path)
+        for _ in range(walk_length):
+            path.append(rng.choice(path[-1].neighbors()))
+        path += steepest_ascent(path[-1], goal, table)[1:]
+    return erase_loops(path) if path[-1] == goal else None
+
+def simulated_annealing(start: PackedState, goal: PackedState, table, rng: random.Random,
+                        max_steps: int = 50000, temperature: float = 1.0,
+                        cooling: float = 0.99995) -> Optional[List[PackedState]]:
+    """Random moves, accepting a worse one with probability exp(-delta / T) as T cools"""
+    h = table.evaluate(start)
+    path = [start]
+    state = start
+    for _ in range(max_steps):
+        if state == goal:
+            return erase_loops(path)
+        move = rng.choice(state.neighbors())
+        move_h = table.update(state, h, move)
+        if move_h <= h or rng.random() < math.exp((h - move_h) / temperature):
+            state, h = move, move_h
+            path.append(state)
+        temperature = max(temperature * cooling, 1e-3)
+    return erase_loops(path) if state == goal else None
+
+def erase_loops(path: List[PackedState]) -> List[PackedState]:
+    """Cut out every cycle, so a revisited state appears once"""
+    result: List[PackedState] = []
+    index: Dict[PackedState, int] = {}
+    for state in path:
+        if state in index:
+            for dropped in result[index[state] + 1:]:
+                del index[dropped]
+            del result[index[state] + 1:]
+        else:
+            index[state] = len(result)
+            result.append(state)
+    return result
+
+def _climb_attempt(start: Tuple[int, ...], goal: Tuple[int, ...], strategy: str, seed: int):
+    """One seeded attempt in a worker process; states travel as plain tuples"""
+    start_state, goal_state = PackedState.from_tiles(start, 3), PackedState.from_tiles(goal, 3)
+    table = heuristic_table(goal, 3)
+    rng = random.Random(seed)
+    if strategy == 'annealing':
+        path = simulated_annealing(start_state, goal_state, table, rng)
+    else:
+        path = random_restarts(start_state, goal_state, table, rng)
+    return seed, None if path is None else [state.tiles() for state in path]
+
+def parallel_climb(start: Sequence[int], goal: Sequence[int], strategy: str = 'restart',
+                   seeds=range(64), workers: int = None) -> Tuple[Optional[int], Optional[List[PackedState]]]:
+    """Run seeded attempts across a process pool and return (seed, path) of the first success.
+
+    Attempts that have not started yet are cancelled once one succeeds. An
+    unsolvable start returns (None, None) at once, without starting the pool.
+    """
+    start, goal = tuple(int(t) for t in start), tuple(int(t) for t in goal)
+    if not solvable(PackedState.from_tiles(start, 3), PackedState.from_tiles(goal, 3)):
+        return None, None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_climb_attempt, start, goal, strategy, seed) for seed in seeds]
+        for future in as_completed(futures):
+            seed, path = future.result()
+            if path is not None:
+                for other in futures:
+                    other.cancel()
+                return seed, [PackedState.from_tiles(tiles, 3) for tiles in path]
+    return None, None
+
 def main() -> None:
-    print("\n=== 8-Puzzle Binary Tree Solver ===")
+    print("\n=== 8-Puzzle Hill Climbing Solver ===")
     try:
         print("\nEnter initial state (9 space-separated integers 0-8)")
         print("Example: 1 2 3 4 0 5 6 7 8\n")
@@ -173,9 +229,12 @@ def main() -> None:
         goal_state = np.array(goal_values).reshape(3, 3)
         puzzle = PuzzleHillClimbing(initial_state, goal_state)
 
-        print("\nSolving using Binary Tree Search...")
+        print("\nSolving using steepest-ascent hill climbing...")
         message = puzzle.solve()
         print(f"\nStatus: {message}")
+        if message != "Goal state reached!":
+            print("\nRetrying with parallel random restarts...")
+            print(f"Status: {puzzle.solve_restarts()}")
         print("\nDisplaying visualization...")
         puzzle.visualize()
 
@@ -0,0 +1,343 @@
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from bucket_queue import BucketQueue
+from grid_search import GridMap, Cell, UNSEEN
+
+Cluster = Tuple[int, int]
+Border = Tuple[str, int, int]  # ('v', cr, cc): between (cr, cc) and (cr, cc + 1); ('h', cr, cc): (cr, cc) and (cr + 1, cc)
+WIDE_ENTRANCE = 6  # Runs at least this long get a transition at each end instead of one in the middle
+BATCH_CLUSTERS = 4096  # Clusters searched together by _local_distances
+
+class HPAStar:
+    """Hierarchical path-finding A* (Botea, Mueller and Schaeffer) over a GridMap.
+
+    The grid is cut into cluster_size x cluster_size clusters. Along every
+    border between two clusters, each run of cells free on both sides is an
+    entrance with one transition (two for runs of WIDE_ENTRANCE or more);
+    its two cells become abstract nodes joined by a cost-1 edge. Inside a
+    cluster, the abstract nodes are joined by their shortest distance
+    within the cluster. A query links start and goal to the nodes of their
+    clusters, runs A* on this small graph and refines each abstract edge
+    with GridMap.a_star on the cluster's own cells, lazily via refine().
+    Paths are near-optimal: they only cross borders at transitions.
+
+    The intra-cluster distances of many clusters are computed together as a
+    batched breadth-first search on bit-packed cluster rows, which is what
+    makes maps of 10k x 10k cells feasible. set_blocked() changes cells and
+    rebuilds only the borders and clusters they touch.
+    """
+
+    def __init__(self, grid_map: GridMap, cluster_size: int = 32):
+        if not 2 <= cluster_size <= 64:
+            raise ValueError("cluster_size must be between 2 and 64")
+        self.grid_map = grid_map
+        self.k = cluster_size
+        self.cluster_rows = -(-grid_map.rows // cluster_size)
+        self.cluster_cols = -(-grid_map.cols // cluster_size)
+        self.borders: Dict[Border, List[Tuple[int, int]]] = {}  # Transition cell pairs per border
+        self.partners: Dict[int, set] = {}  # Abstract node -> nodes one step away across a border
+        self.clusters: Dict[Cluster, tuple] = {}  # Cluster -> (nodes, node -> row, distance matrix)
+        self._local_maps: Dict[Cluster, GridMap] = {}
+        began = time.perf_counter()
+        for border in self._all_borders():
+            self.borders[border] = self._transitions(border)
+        self._link(self.borders)
+        self._build_clusters([(cr, cc) for cr in range(self.cluster_rows) for cc in range(self.cluster_cols)])
+        self.build_time = time.perf_counter() - began
+
+    # Abstract graph construction
+
+    def _free(self, rows: slice, cols: slice) -> np.ndarray:
+        """Free cells of a window of the map, in unpadded coordinates"""
+        grid_map = self.grid_map
+        return grid_map.blocked.reshape(-1, grid_map.width)[1:-1, 1:-1][rows, cols] == 0
+
+    def _all_borders(self) -> Iterator[Border]:
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                if cc + 1 < self.cluster_cols:
+                    yield 'v', cr, cc
+                if cr + 1 < self.cluster_rows:
+                    yield 'h', cr, cc
+
+    def _transitions(self, border: Border) -> List[Tuple[int, int]]:
+        """Transition cell pairs (flat indices) along one border"""
+        kind, cr, cc = border
+        k, index = self.k, self.grid_map.index
+        if kind == 'v':
+            col = (cc + 1) * k - 1
+            lo, hi = cr * k, min((cr + 1) * k, self.grid_map.rows)
+            sides = self._free(slice(lo, hi), slice(col, col + 2))
+            both = sides[:, 0] & sides[:, 1]
+            return [(index((lo + p, col)), index((lo + p, col + 1))) for p in _entrance_points(both)]
+        row = (cr + 1) * k - 1
+        lo, hi = cc * k, min((cc + 1) * k, self.grid_map.cols)
+        sides = self._free(slice(row, row + 2), slice(lo, hi))
+        both = sides[0] & sides[1]
+        return [(index((row, lo + p)), index((row + 1, lo + p))) for p in _entrance_points(both)]
+
+    def _link(self, borders: Iterable[Border]) -> None:
+        for border in borders:
+            for a, b in self.borders[border]:
+                self.partners.setdefault(a, set()).add(b)
+                self.partners.setdefault(b, set()).add(a)
+
+    def _cluster_borders(self, cluster: Cluster) -> List[Border]:
+        cr, cc = cluster
+        borders = [('v', cr, cc - 1), ('v', cr, cc), ('h', cr - 1, cc), ('h', cr, cc)]
+        return [border for border in borders if border in self.borders]
+
+    def _cluster_nodes(self, cluster: Cluster) -> List[int]:
+        nodes = set()
+        for border in self._cluster_borders(cluster):
+            for pair in self.borders[border]:
+                nodes.update(cell for cell in pair if self.cluster_of(cell) == cluster)
+        return sorted(nodes)
+
+    def _build_clusters(self, clusters: Sequence[Cluster]) -> None:
+        node_lists = [self._cluster_nodes(cluster) for cluster in clusters]
+        matrices = self._local_distances(list(zip(clusters, node_lists, node_lists)), symmetric=True)
+        for cluster, nodes, matrix in zip(clusters, node_lists, matrices):
+            self.clusters[cluster] = (nodes, {node: i for i, node in enumerate(nodes)}, matrix)
+            self._local_maps.pop(cluster, None)
+
+    def cluster_of(self, index: int) -> Cluster:
+        r, c = self.grid_map.cell(index)
+        return r // self.k, c // self.k
+
+    def _local_distances(self, jobs: Sequence[Tuple[Cluster, List[int], List[int]]],
+                         symmetric: bool = False) -> List[np.ndarray]:
+        """Distances inside each job's cluster from its sources to its targets (-1: unreachable).
+
+        All jobs advance together: every cluster is a k x k block whose rows
+        are bit-packed into one word each, so one frontier step of every
+        cluster is a handful of whole-array shifts and masks. Shifts never
+        leave a block, so clusters need no walls between them. Round i
+        searches from the i-th source of every job; a job drops out of the
+        batch once all its targets are reached or its frontier dies out.
+        With symmetric (sources are the targets), round i only looks for
+        targets i onwards and the matrix is mirrored at the end. Jobs are
+        taken BATCH_CLUSTERS at a time to bound memory.
+        """
+        results = []
+        for first in range(0, len(jobs), BATCH_CLUSTERS):
+            results.extend(self._batch_distances(jobs[first:first + BATCH_CLUSTERS], symmetric))
+        return results
+
+    def _batch_distances(self, jobs, symmetric) -> List[np.ndarray]:
+        k, width = self.k, self.grid_map.width
+        bits = 32 if k <= 32 else 64
+        word = np.uint32 if bits == 32 else np.uint64
+        one = word(1)
+        n = len(jobs)
+        sources = np.full((n, max(len(job[1]) for job in jobs) or 1), -1, dtype=np.int64)
+        targets = np.full((n, max(len(job[2]) for job in jobs) or 1), -1, dtype=np.int64)
+        blocks = np.zeros((n, k, bits), dtype=bool)
+        for b, ((cr, cc), job_sources, job_targets) in enumerate(jobs):
+            sources[b, :len(job_sources)] = job_sources
+            targets[b, :len(job_targets)] = job_targets
+            cells = self._free(slice(cr * k, (cr + 1) * k), slice(cc * k, (cc + 1) * k))
+            blocks[b, :cells.shape[0], :cells.shape[1]] = cells
+        free_words = np.packbits(blocks, axis=2, bitorder='little').view(f'<u{bits // 8}')[:, :, 0]
+        del blocks
+        # Cluster-local row and bit of every source and target
+        top = np.array([cr * k for (cr, _), _, _ in jobs])
+        left = np.array([cc * k for (_, cc), _, _ in jobs])
+        target_valid = targets >= 0
+        target_rows = np.where(target_valid, targets // width - 1 - top[:, None], 0)
+        target_bits = np.where(target_valid, targets % width - 1 - left[:, None], 0).astype(word)
+        dist = np.full(sources.shape + targets.shape[1:], UNSEEN, dtype=np.int32)
+
+        for i in range(sources.shape[1]):
+            batch = np.flatnonzero(sources[:, i] >= 0)
+            if not batch.size:
+                continue
+            rows = np.arange(batch.size)
+            frontier = np.zeros((batch.size, k), dtype=word)
+            origin = sources[batch, i]
+            frontier[rows, origin // width - 1 - top[batch]] = one << (origin % width - 1 - left[batch]).astype(word)
+            unvisited = free_words[batch] & ~frontier
+            wanted = target_valid[batch]
+            if symmetric:
+                wanted[:, :i] = False
+            sought = wanted.copy()
+            steps = np.zeros(wanted.shape, dtype=np.int32)  # Steps taken while each target was still wanted
+            while True:
+                wanted &= ~((frontier[rows[:, None], target_rows[batch]] >> target_bits[batch]) & one).astype(bool)
+                grown = (frontier << one) | (frontier >> one)
+                grown[:, 1:] |= frontier[:, :-1]
+                grown[:, :-1] |= frontier[:, 1:]
+                grown &= unvisited
+                unvisited &= ~grown
+                frontier = grown
+                alive = wanted.any(axis=1)
+                steps += wanted
+                alive &= frontier.any(axis=1)
+                if 4 * np.count_nonzero(alive) < 3 * batch.size:  # Retire finished jobs once a quarter is done
+                    done = ~alive
+                    found = sought[done] & ~wanted[done]
+                    dist[batch[done], i] = np.where(found, steps[done], UNSEEN)
+                    if not alive.any():
+                        break
+                    frontier, unvisited, wanted, sought, steps, batch = (
+                        frontier[alive], unvisited[alive], wanted[alive], sought[alive], steps[alive], batch[alive])
+                    rows = rows[:batch.size]
+        if symmetric:
+            dist = np.maximum(dist, dist.transpose(0, 2, 1))
+        return [dist[b, :len(job_sources), :len(job_targets)].copy() for b, (_, job_sources, job_targets) in enumerate(jobs)]
+
+    # Queries
+
+    def neighbors(self, node: int) -> Iterator[Tuple[int, int]]:
+        """(neighbour, cost) pairs of an abstract node"""
+        for partner in self.partners.get(node, ()):
+            yield partner, 1
+        nodes, row, matrix = self.clusters[self.cluster_of(node)]
+        i = row[node]
+        for j, d in enumerate(matrix[i].tolist()):
+            if d > 0:
+                yield nodes[j], int(d)
+
+    def abstract_path(self, start: Cell, goal: Cell, stats: Dict[str, int] = None) -> Optional[List[int]]:
+        """Flat cell indices of the abstract path from start to goal, or None"""
+        stats = {} if stats is None else stats
+        stats.update(nodes_expanded=0, peak_frontier=1)
+        grid_map = self.grid_map
+        if not (grid_map.free(start) and grid_map.free(goal)):
+            return None
+        source, target = grid_map.index(start), grid_map.index(goal)
+        if source == target:
+            return [source]
+        # Temporary edges from start and goal to the nodes of their clusters
+        start_cluster, goal_cluster = self.cluster_of(source), self.cluster_of(target)
+        start_nodes = self.clusters[start_cluster][0]
+        goal_nodes = self.clusters[goal_cluster][0]
+        targets = start_nodes + [target] if start_cluster == goal_cluster else start_nodes
+        from_start, to_goal = self._local_distances([(start_cluster, [source], targets),
+                                                     (goal_cluster, [target], goal_nodes)])
+        extra = {source: [(node, int(d)) for node, d in zip(targets, from_start[0]) if d >= 0 and node != source]}
+        into_goal = {node: int(d) for node, d in zip(goal_nodes, to_goal[0]) if d >= 0}
+
+        goal_row, goal_col = grid_map.cell(target)
+
+        def h(index):
+            r, c = grid_map.cell(index)
+            return abs(r - goal_row) + abs(c - goal_col)
+
+        g = {source: 0}
+        parent = {source: None}
+        open_list = BucketQueue('high_g')
+        open_list.push(h(source), source, 0)
+        closed = set()
+        while open_list:
+            _, node = open_list.pop()
+            if node in closed:
+                continue
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+            closed.add(node)
+            stats['nodes_expanded'] += 1
+            if node == source:
+                edges = extra[source] + [(partner, 1) for partner in self.partners.get(source, ())]
+            else:
+                edges = list(self.neighbors(node))
+            if node in into_goal and node != source:
+                edges.append((target, into_goal[node]))
+            for neighbor, cost in edges:
+                new_g = g[node] + cost
+                if neighbor not in closed and new_g < g.get(neighbor, new_g + 1):
+                    g[neighbor] = new_g
+                    parent[neighbor] = node
+                    open_list.push(new_g + h(neighbor), neighbor, new_g)
+            stats['peak_frontier'] = max(stats['peak_frontier'], len(open_list))
+        return None
+
+    def refine(self, abstract: Sequence[int]) -> Iterator[List[Cell]]:
+        """Cell segments of an abstract path, each found by A* inside one cluster when it is needed"""
+        grid_map = self.grid_map
+        yield [grid_map.cell(abstract[0])]
+        for a, b in zip(abstract, abstract[1:]):
+            if b - a in grid_map.offsets:
+                yield [grid_map.cell(b)]
+                continue
+            cluster = self.cluster_of(a)
+            local = self._local_map(cluster)
+            r0, c0 = cluster[0] * self.k, cluster[1] * self.k
+            (ra, ca), (rb, cb) = grid_map.cell(a), grid_map.cell(b)
+            segment = local.a_star((ra - r0, ca - c0), (rb - r0, cb - c0))
+            yield [(r + r0, c + c0) for r, c in segment[1:]]
+
+    def _local_map(self, cluster: Cluster) -> GridMap:
+        local = self._local_maps.get(cluster)
+        if local is None:
+            k = self.k
+            cells = self._free(slice(cluster[0] * k, (cluster[0] + 1) * k), slice(cluster[1] * k, (cluster[1] + 1) * k))
+            local = self._local_maps[cluster] = GridMap(~cells)
+        return local
+
+    def search(self, start: Cell, goal: Cell, stats: Dict[str, int] = None) -> Optional[List[Cell]]:
+        """Refined cell path from start to goal, or None; stats counts abstract expansions"""
+        abstract = self.abstract_path(start, goal, stats)
+        if abstract is None:
+            return None
+        path = []
+        for segment in self.refine(abstract):
+            path.extend(segment)
+        return path
+
+    # Map changes
+
+    def set_blocked(self, cells: Iterable[Cell], blocked: bool = True) -> List[Cluster]:
+        """Change cells on the map and rebuild only what they affect; returns the rebuilt clusters"""
+        changed = self.grid_map.set_blocked(cells, blocked)
+        k = self.k
+        borders, clusters = set(), set()
+        for r, c in changed:
+            cr, cc = r // k, c // k
+            clusters.add((cr, cc))
+            # A cell on a cluster's edge row or column takes part in that border's entrances
+            if c % k == k - 1:
+                borders.add(('v', cr, cc))
+            if c % k == 0:
+                borders.add(('v', cr, cc - 1))
+            if r % k == k - 1:
+                borders.add(('h', cr, cc))
+            if r % k == 0:
+                borders.add(('h', cr - 1, cc))
+        borders = {border for border in borders if border in self.borders}
+        dropped = set()
+        for border in borders:
+            for a, b in self.borders[border]:
+                self.partners[a].discard(b)
+                self.partners[b].discard(a)
+                dropped.update((a, b))
+            self.borders[border] = self._transitions(border)
+            kind, cr, cc = border
+            clusters.update(((cr, cc), (cr, cc + 1) if kind == 'v' else (cr + 1, cc)))
+        self._link(borders)
+        for node in dropped:
+            if not self.partners[node]:
+                del self.partners[node]
+        clusters = sorted(clusters)
+        self._build_clusters(clusters)
+        return clusters
+
+    @property
+    def node_count(self) -> int:
+        return sum(len(nodes) for nodes, _, _ in self.clusters.values())
+
+def _entrance_points(both: np.ndarray) -> List[int]:
+    """Positions of the transitions along one border, given where both sides are free"""
+    edges = np.diff(np.concatenate(([0], both.astype(np.int8), [0])))
+    points = []
+    for first, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if end - first >= WIDE_ENTRANCE:
+            points.extend((int(first), int(end - 1)))
+        else:
+            points.append(int(first + (end - first - 1) // 2))
+    return points
@@ -0,0 +1,119 @@
+import sys
+import time
+from typing import List, Optional, Tuple
+from puzzle_state import PackedState, adjacent, tile_bits, solvable
+
+FOUND = -1
+
+class IDAStar:
+    """Iterative-deepening A* over packed puzzle states.
+
+    The board is a single packed integer plus the blank position that is
+    moved and undone in place with xors, so memory is O(depth): only the
+    blank positions along the current branch are kept. The move that would
+    undo the previous one is never generated. Works with any heuristic
+    object that has evaluate(state) and update(parent, h, child), i.e. every
+    table from puzzle_heuristics and pattern_db.
+
+    After search(), nodes_expanded, elapsed and bounds describe the run.
+    """
+
+    def __init__(self, start: PackedState, goal: PackedState, table):
+        self.start = start
+        self.goal = goal
+        self.table = table
+        self.nodes_expanded = 0
+        self.elapsed = 0.0
+        self.bounds = []
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes_expanded / self.elapsed if self.elapsed else 0.0
+
+    def search(self, max_bound: int = None) -> Optional[List[Tuple[PackedState, int]]]:
+        """Optimal path as (state, h) pairs from start to goal, or None.
+
+        Unsolvable starts are rejected by a parity check before searching;
+        max_bound additionally stops the deepening once the f-bound passes it.
+        """
+        began = time.perf_counter()
+        self.nodes_expanded = 0
+        self.bounds = []
+        if not solvable(self.start, self.goal):
+            self.elapsed = 0.0
+            return None
+        h = self.table.evaluate(self.start)
+        moves = []
+        bound = h
+        try:
+            while max_bound is None or bound <= max_bound:
+                self.bounds.append(bound)
+                bound = self._bounded_search(bound, h, moves)
+                if bound == FOUND:
+                    return self._replay(moves)
+                if bound == float('inf'):
+                    return None
+            return None
+        finally:
+            self.elapsed = time.perf_counter() - began
+
+    def _bounded_search(self, bound: int, root_h: int, moves: List[int]) -> float:
+        """One depth-first pass below bound; returns FOUND or the next bound"""
+        size = self.start.size
+        adj = adjacent(size)
+        bits = tile_bits(size)
+        mask = (1 << bits) - 1
+        update = self.table.update
+        goal_code = self.goal.code
+        code = self.start.code
+        blank = self.start.blank
+        nodes = 0
+
+        def dfs(g, h, prev_blank):
+            nonlocal code, blank, nodes
+            if code == goal_code:
+                return FOUND
+            nodes += 1
+            parent = PackedState(code, blank, size)
+            minimum = float('inf')
+            for pos in adj[blank]:
+                if pos == prev_blank:
+                    continue  # Undoes the move that led here
+                tile = (code >> (bits * pos)) & mask
+                child_code = code ^ (tile << (bits * pos)) ^ (tile << (bits * blank))
+                child_h = update(parent, h, PackedState(child_code, pos, size))
+                f = g + 1 + child_h
+                if f > bound:
+                    if f < minimum:
+                        minimum = f
+                    continue
+                old_code, old_blank = code, blank
+                code, blank = child_code, pos  # Move
+                moves.append(pos)
+                t = dfs(g + 1, child_h, old_blank)
+                if t == FOUND:
+                    return FOUND
+                moves.pop()
+                code, blank = old_code, old_blank  # Undo
+                if t < minimum:
+                    minimum = t
+            return minimum
+
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, bound + 100))
+        try:
+            return dfs(0, root_h, -1)
+        finally:
+            sys.setrecursionlimit(limit)
+            self.nodes_expanded += nodes
+
+    def _replay(self, moves: List[int]) -> List[Tuple[PackedState, int]]:
+        state = self.start
+        h = self.table.evaluate(state)
+        path = [(state, h)]
+        for pos in moves:
+            child = state.move(pos)
+            h = self.table.update(state, h, child)
+            path.append((child, h))
+            state = child
+        return path
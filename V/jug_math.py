@@ -0,0 +1,90 @@
+from math import gcd
+from jug_search import JugSearch
+
+def extended_gcd(a, b):
+    """Return (g, s, t) with a*s + b*t == g == gcd(a, b)"""
+    old_r, r = a, b
+    old_s, s = 1, 0
+    old_t, t = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_s, s = s, old_s - q * s
+        old_t, t = t, old_t - q * t
+    return old_r, old_s, old_t
+
+def is_measurable(x, y, z):
+    """z litres can be measured iff it fits in a jug and is a multiple of gcd(x, y)"""
+    if z == 0:
+        return True  # The empty start state already holds it
+    g = gcd(x, y)
+    return g != 0 and z <= max(x, y) and z % g == 0
+
+def _pour_steps(a, b, z):
+    """Pours needed by the "fill A, pour A -> B, empty B when full" cycle to reach z.
+
+    With k fills of A the cycle has poured k*a litres into B; z first shows
+    up for the smallest k with k*a = z (mod b). If z < a it appears in A
+    just after the m-th time B fills, otherwise in B just after A empties.
+    """
+    g, s, _ = extended_gcd(a, b)
+    b_g = b // g
+    k = (z // g) * s % b_g or b_g  # Smallest k >= 1 with k*a = z (mod b)
+    m = (k * a - z) // b           # Times B has filled by then
+    if z < a:
+        return 2 * (k + m - 1)
+    return 2 * (k + m)
+
+def min_pours(x, y, z):
+    """Length of the shortest pour sequence measuring z, or -1 if impossible.
+
+    Runs in O(log min(x, y)), so capacities in the 10^9 range are fine.
+    """
+    if not is_measurable(x, y, z):
+        return -1
+    if z == 0:
+        return 0
+    if z == x or z == y:
+        return 1
+    return min(_pour_steps(x, y, z), _pour_steps(y, x, z))
+
+def _pour_cycle(a, b, steps):
+    """Yield the states (A, B) of the A -> B cycle for the given number of steps"""
+    amount_a = amount_b = 0
+    yield amount_a, amount_b
+    for _ in range(steps):
+        if amount_a == 0:
+            amount_a = a
+        elif amount_b == b:
+            amount_b = 0
+        else:
+            poured = min(amount_a, b - amount_b)
+            amount_a, amount_b = amount_a - poured, amount_b + poured
+        yield amount_a, amount_b
+
+def pour_sequence(x, y, z):
+    """Lazily yield an optimal state sequence from (0, 0) measuring z.
+
+    The length is known up front from min_pours, so the states are generated
+    on demand instead of being stored; returns None if z cannot be measured.
+    """
+    steps = min_pours(x, y, z)
+    if steps == -1:
+        return None
+    if z == 0:
+        return iter([(0, 0)])
+    if z == y and z != x:
+        return iter([(0, 0), (0, y)])
+    if z == x or z == 0 or _pour_steps(x, y, z) == steps:
+        return _pour_cycle(x, y, steps)
+    return ((a, b)[::-1] for a, b in _pour_cycle(y, x, steps))
+
+def verify_with_bfs(x, y, z):
+    """Cross-check the closed form against a BFS over the full state space"""
+    search = JugSearch(x, y)
+    goal = search.bfs(z)
+    expected = search.level[goal] if goal != -1 and z <= max(x, y) else -1
+    path = pour_sequence(x, y, z)
+    states = list(path) if path is not None else []
+    return (min_pours(x, y, z) == expected
+            and (expected == -1 or (len(states) == expected + 1 and z in states[-1])))
@@ -0,0 +1,331 @@
+from array import array
+from collections import deque
+from functools import lru_cache
+import networkx as nx
+
+class JugSearch:
+    """Dense-array search over the (max_x+1)*(max_y+1) states of the two-jug problem.
+
+    A state (x, y) lives at index x*(max_y+1)+y, so visited, discovered,
+    parent and level data are flat arrays and every membership test is O(1).
+    """
+
+    def __init__(self, max_x, max_y):
+        self.max_x = max_x
+        self.max_y = max_y
+        self.width = max_y + 1
+        size = (max_x + 1) * self.width
+        self.parent = array('l', [-1]) * size
+        self.level = array('l', [-1]) * size
+        self.visited = bytearray(size)
+        self.discovered = bytearray(size)
+        self.order = array('l')  # Discovery order, root first
+        self.nodes_expanded = 0
+
+    def index(self, state):
+        return state[0] * self.width + state[1]
+
+    def state(self, idx):
+        return divmod(idx, self.width)
+
+    def next_indices(self, idx):
+        """Child indices in move order: fill X, fill Y, empty X, empty Y, pour X -> Y, pour Y -> X"""
+        max_x, max_y, width = self.max_x, self.max_y, self.width
+        x, y = divmod(idx, width)
+        to_y = min(x, max_y - y)
+        to_x = min(y, max_x - x)
+        return (
+            max_x * width + y,            # Fill jug X
+            x * width + max_y,            # Fill jug Y
+            y,                            # Empty jug X
+            x * width,                    # Empty jug Y
+            (x - to_y) * width + y + to_y,  # Pour X -> Y
+            (x + to_x) * width + y - to_x   # Pour Y -> X
+        )
+
+    def _discover(self, child, idx):
+        self.discovered[child] = 1
+        self.parent[child] = idx
+        self.level[child] = self.level[idx] + 1
+        self.order.append(child)
+
+    def _start(self):
+        root = 0
+        self.discovered[root] = 1
+        self.level[root] = 0
+        self.order.append(root)
+        return root
+
+    def _is_goal(self, idx, z):
+        x, y = divmod(idx, self.width)
+        return x == z or y == z
+
+    def bfs(self, z=None):
+        """Breadth-first search from (0, 0). Returns the goal index or -1.
+
+        With z=None no state is a goal and every reachable state is expanded.
+        """
+        queue = deque([self._start()])
+        visited, discovered = self.visited, self.discovered
+
+        while queue:
+            idx = queue.popleft()
+            visited[idx] = 1
+            self.nodes_expanded += 1
+
+            if self._is_goal(idx, z):
+                return idx
+
+            for child in self.next_indices(idx):
+                if not discovered[child]:
+                    self._discover(child, idx)
+                    queue.append(child)
+        return -1
+
+    def dfs(self, z):
+        """Depth-first search from (0, 0). Returns the goal index or -1."""
+        stack = [self._start()]
+        visited, discovered = self.visited, self.discovered
+
+        while stack:
+            idx = stack.pop()
+            if visited[idx]:
+                continue
+            visited[idx] = 1
+            self.nodes_expanded += 1
+
+            if self._is_goal(idx, z):
+                return idx
+
+            for child in reversed(self.next_indices(idx)):
+                if not visited[child]:
+                    stack.append(child)
+                    if not discovered[child]:  # Only the first discovery becomes a tree edge
+                        self._discover(child, idx)
+        return -1
+
+    def prev_indices(self, idx):
+        """Inverse of next_indices: boundary states one move away from idx.
+
+        Every move leaves a jug empty or full, so interior states are never
+        reachable from (0, 0) and are left out of the predecessor lists.
+        """
+        max_x, max_y, width = self.max_x, self.max_y, self.width
+        x, y = divmod(idx, width)
+        preds = set()
+
+        def add(a, b):
+            if a in (0, max_x) or b in (0, max_y):
+                preds.add(a * width + b)
+
+        if x == max_x or x == 0:  # Fill jug X / Empty jug X
+            for a in range(max_x + 1):
+                add(a, y)
+        if y == max_y or y == 0:  # Fill jug Y / Empty jug Y
+            for b in range(max_y + 1):
+                add(x, b)
+        if x == 0:  # Pour X -> Y that emptied X
+            for t in range(min(y, max_x) + 1):
+                add(t, y - t)
+        if y == max_y:  # Pour X -> Y that filled Y
+            for t in range(min(max_y, max_x - x) + 1):
+                add(x + t, max_y - t)
+        if y == 0:  # Pour Y -> X that emptied Y
+            for t in range(min(x, max_y) + 1):
+                add(x - t, t)
+        if x == max_x:  # Pour Y -> X that filled X
+            for t in range(min(max_x, max_y - y) + 1):
+                add(max_x - t, y + t)
+        return preds
+
+    def bidirectional(self, z):
+        """Bidirectional BFS meeting in the middle. Returns the goal index or -1.
+
+        The forward half fills parent/level like bfs(); the backward half runs
+        from every goal state over prev_indices. The side with the smaller
+        frontier expands one whole level at a time, and the best meeting point
+        of that level gives a shortest path, which is spliced into parent.
+        """
+        size = len(self.parent)
+        toward = array('l', [-1]) * size  # Next state on the way to a goal
+        back_level = array('l', [-1]) * size
+        forward = [self._start()]
+        backward = []
+        goals = [(z, b) for b in range(self.max_y + 1)] if z <= self.max_x else []
+        goals += [(a, z) for a in range(self.max_x + 1)] if z <= self.max_y else []
+        for a, b in goals:
+            idx = a * self.width + b
+            if back_level[idx] == -1 and (a in (0, self.max_x) or b in (0, self.max_y)):
+                back_level[idx] = 0
+                backward.append(idx)
+        if back_level[0] == 0:
+            self.visited[0] = 1
+            self.nodes_expanded += 1
+            return 0
+
+        while forward and backward:
+            best = None
+            if len(forward) <= len(backward):
+                next_level = []
+                for idx in forward:
+                    self.visited[idx] = 1
+                    self.nodes_expanded += 1
+                    for child in self.next_indices(idx):
+                        if back_level[child] != -1:
+                            length = self.level[idx] + 1 + back_level[child]
+                            if best is None or length < best[0]:
+                                best = (length, idx, child)
+                        if not self.discovered[child]:
+                            self._discover(child, idx)
+                            next_level.append(child)
+                forward = next_level
+            else:
+                next_level = []
+                for idx in backward:
+                    self.nodes_expanded += 1
+                    for pred in self.prev_indices(idx):
+                        if self.discovered[pred]:
+                            length = self.level[pred] + 1 + back_level[idx]
+                            if best is None or length < best[0]:
+                                best = (length, pred, idx)
+                        if back_level[pred] == -1:
+                            back_level[pred] = back_level[idx] + 1
+                            toward[pred] = idx
+                            next_level.append(pred)
+                backward = next_level
+
+            if best is not None:
+                # Splice the backward half of the path onto the forward tree
+                _, idx, child = best
+                while child != -1:
+                    if not self.discovered[child]:
+                        self.discovered[child] = 1
+                        self.order.append(child)
+                    self.parent[child] = idx
+                    self.level[child] = self.level[idx] + 1
+                    idx, child = child, toward[child]
+                return idx
+        return -1
+
+    def iddfs(self, z, max_depth=None):
+        """Iterative-deepening DFS. Returns the goal index or -1.
+
+        Each iteration is a depth-limited DFS that only remembers the current
+        path (plus one successor iterator per level), so working memory is
+        O(depth). Only the solution path is written to parent/level.
+        """
+        root = 0
+        if max_depth is None:
+            max_depth = len(self.parent)
+
+        for limit in range(max_depth + 1):
+            path = [root]
+            on_path = {root}
+            iterators = [iter(self.next_indices(root))]
+            self.nodes_expanded += 1
+            if self._is_goal(root, z):
+                return self._record_path(path)
+            cut_off = False
+
+            while iterators:
+                child = next(iterators[-1], None)
+                if child is None:
+                    iterators.pop()
+                    on_path.discard(path.pop())
+                    continue
+                if child in on_path:
+                    continue
+                self.nodes_expanded += 1
+                if self._is_goal(child, z):
+                    return self._record_path(path + [child])
+                if len(path) < limit:
+                    path.append(child)
+                    on_path.add(child)
+                    iterators.append(iter(self.next_indices(child)))
+                else:
+                    cut_off = True
+
+            if not cut_off:
+                break  # The whole reachable space fits within this limit
+        return -1
+
+    def _record_path(self, states):
+        """Store a root-first index path in parent/level and return its end"""
+        self._start()
+        for prev, idx in zip(states, states[1:]):
+            self._discover(idx, prev)
+        for idx in states:
+            self.visited[idx] = 1
+        return states[-1]
+
+    def path(self, idx):
+        """Walk the parent array back from idx and return the states root-first"""
+        path = []
+        while idx != -1:
+            path.append(self.state(idx))
+            idx = self.parent[idx]
+        return path[::-1]
+
+    def to_graph(self):
+        """Search tree as an nx.DiGraph with each node's BFS level in 'subset'"""
+        graph = nx.DiGraph()
+        for idx in self.order:
+            graph.add_node(self.state(idx), subset=self.level[idx])
+            if self.parent[idx] != -1:
+                graph.add_edge(self.state(self.parent[idx]), self.state(idx))
+        return graph
+
+
+class JugTable:
+    """Shortest pour sequences to every state reachable from (0, 0).
+
+    Only reachable states are kept: order[i] is the i-th state in BFS order,
+    parent[i] and dist[i] refer to positions in that same array, and
+    first_hit[z] is the first BFS position holding z litres in either jug.
+    """
+
+    def __init__(self, max_x, max_y):
+        search = JugSearch(max_x, max_y)
+        search.bfs()
+
+        position = {idx: pos for pos, idx in enumerate(search.order)}
+        self.width = search.width
+        self.order = array('l', search.order)
+        self.parent = array('l', (position.get(search.parent[idx], -1) for idx in search.order))
+        self.dist = array('l', (search.level[idx] for idx in search.order))
+        self.first_hit = array('l', [-1]) * (max(max_x, max_y) + 1)
+
+        # BFS order is non-decreasing in distance, so the first hit is the closest
+        for pos, idx in enumerate(self.order):
+            x, y = divmod(idx, self.width)
+            if self.first_hit[x] == -1:
+                self.first_hit[x] = pos
+            if self.first_hit[y] == -1:
+                self.first_hit[y] = pos
+
+    def distance(self, z):
+        """Number of pours needed to measure z, or -1 if it cannot be measured"""
+        if not 0 <= z < len(self.first_hit) or self.first_hit[z] == -1:
+            return -1
+        return self.dist[self.first_hit[z]]
+
+    def path(self, z):
+        """Shortest state sequence measuring z, in O(path length); None if unreachable"""
+        if self.distance(z) == -1:
+            return None
+        path = []
+        pos = self.first_hit[z]
+        while pos != -1:
+            path.append(divmod(self.order[pos], self.width))
+            pos = self.parent[pos]
+        return path[::-1]
+
+@lru_cache(maxsize=32)
+def reachability_table(x, y):
+    """One full BFS per jug pair, kept in an LRU cache"""
+    return JugTable(x, y)
+
+def solve_many(x, y, targets):
+    """Map each target amount to its shortest pour sequence (None if impossible)"""
+    table = reachability_table(x, y)
+    return {z: table.path(z) for z in targets}
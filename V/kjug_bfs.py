@@ -0,0 +1,139 @@
+from math import gcd, prod
+import numpy as np
+
+# Keep a dense visited array while the packed key space stays below this size
+DENSE_LIMIT = 1 << 26
+
+def pack_strides(capacities):
+    """Mixed-radix strides so that key = sum(amount[i] * stride[i])"""
+    strides = np.ones(len(capacities), dtype=np.int64)
+    for i in range(len(capacities) - 2, -1, -1):
+        strides[i] = strides[i + 1] * (capacities[i + 1] + 1)
+    return strides
+
+def unpack(keys, capacities, strides):
+    """Decode packed keys into an (n, k) array of jug amounts"""
+    radix = np.asarray(capacities, dtype=np.int64) + 1
+    return (keys[:, None] // strides[None, :]) % radix[None, :]
+
+def successor_keys(states, keys, capacities, strides):
+    """Packed keys of every fill/empty/pour successor of a whole frontier.
+
+    Returns (child_keys, parent_keys) as flat arrays, one entry per move.
+    """
+    caps = np.asarray(capacities, dtype=np.int64)
+    k = len(capacities)
+    children = []
+    for i in range(k):
+        children.append(keys + (caps[i] - states[:, i]) * strides[i])  # Fill jug i
+        children.append(keys - states[:, i] * strides[i])               # Empty jug i
+        for j in range(k):
+            if i != j:
+                poured = np.minimum(states[:, i], caps[j] - states[:, j])  # Pour i -> j
+                children.append(keys + poured * (strides[j] - strides[i]))
+    n_moves = len(children)
+    return np.concatenate(children), np.tile(keys, n_moves)
+
+def k_jug_bfs(capacities, target, jug=None, start=None):
+    """Level-synchronous BFS for three or more jugs.
+
+    Each BFS level is expanded at once: the frontier is an (n, k) integer
+    array, successors are generated with array arithmetic on packed keys and
+    deduplicated with np.unique plus a visited array (or np.isin once the key
+    space is too large for a dense one).
+
+    Args:
+        capacities: Jug capacities, e.g. (8, 5, 3)
+        target: Amount to measure
+        jug: If given, the target must end up in this jug; otherwise in any jug
+        start: Initial amounts, all jugs empty by default
+
+    Returns:
+        (path, nodes_expanded) where path is a list of state tuples, or None
+    """
+    capacities = tuple(int(c) for c in capacities)
+    if jug is not None and not 0 <= jug < len(capacities):
+        raise ValueError(f"jug must be between 0 and {len(capacities) - 1}")
+    start = np.zeros(len(capacities), dtype=np.int64) if start is None else np.asarray(start, dtype=np.int64)
+    if start.shape != (len(capacities),) or np.any(start < 0) or np.any(start > capacities):
+        raise ValueError("start must give one amount per jug, within its capacity")
+    # Every reachable amount is a multiple of the gcd of the capacities and the starting amounts
+    step = gcd(*capacities, *(int(a) for a in start))
+    if not 0 <= target <= max(capacities) or (target % step != 0 if step else target != 0):
+        return None, 0
+    total = prod(c + 1 for c in capacities)
+    if total >= 1 << 63:
+        raise ValueError("State space too large for 64-bit packed keys")
+
+    strides = pack_strides(capacities)
+    frontier_keys = np.array([int(start @ strides)], dtype=np.int64)
+
+    dense = total <= DENSE_LIMIT
+    if dense:
+        seen = np.zeros(total, dtype=bool)
+        seen[frontier_keys] = True
+    else:
+        seen = frontier_keys.copy()  # Sorted array of visited keys
+
+    # levels[d] = (sorted keys at depth d, their parent keys)
+    levels = [(frontier_keys, np.array([-1], dtype=np.int64))]
+    nodes_expanded = 0
+
+    while frontier_keys.size:
+        states = unpack(frontier_keys, capacities, strides)
+        hits = states[:, jug] == target if jug is not None else np.any(states == target, axis=1)
+        if hits.any():
+            return _reconstruct(levels, int(frontier_keys[np.argmax(hits)]), capacities, strides), nodes_expanded
+
+        nodes_expanded += frontier_keys.size
+        child_keys, parent_keys = successor_keys(states, frontier_keys, capacities, strides)
+        child_keys, first = np.unique(child_keys, return_index=True)
+        parent_keys = parent_keys[first]
+
+        if dense:
+            fresh = ~seen[child_keys]
+            child_keys, parent_keys = child_keys[fresh], parent_keys[fresh]
+            seen[child_keys] = True
+        else:
+            fresh = ~np.isin(child_keys, seen, assume_unique=True)
+            child_keys, parent_keys = child_keys[fresh], parent_keys[fresh]
+            seen = np.union1d(seen, child_keys)
+
+        levels.append((child_keys, parent_keys))
+        frontier_keys = child_keys
+
+    return None, nodes_expanded
+
+def _reconstruct(levels, key, capacities, strides):
+    """Walk parent keys back through the stored levels"""
+    path = []
+    for depth in range(len(levels) - 1, -1, -1):
+        keys, parents = levels[depth]
+        pos = np.searchsorted(keys, key)
+        if pos < keys.size and keys[pos] == key:
+            path.append(tuple(int(a) for a in unpack(np.array([key]), capacities, strides)[0]))
+            key = int(parents[pos])
+    return path[::-1]
+
+def main():
+    print("k-Jug Water Problem Solver using level-synchronous BFS")
+    print("------------------------------------------------------")
+    try:
+        capacities = [int(c) for c in input("\nEnter jug capacities (space-separated): ").split()]
+        target = int(input("Enter target amount: "))
+        jug_input = input("Target jug index (blank for any jug): ").strip()
+        jug = int(jug_input) if jug_input else None
+    except ValueError:
+        print("Please enter valid numbers.")
+        return
+
+    path, nodes_expanded = k_jug_bfs(capacities, target, jug)
+    if path is None:
+        print(f"No solution found ({nodes_expanded} states expanded).")
+        return
+    print(f"\nSolution in {len(path) - 1} steps ({nodes_expanded} states expanded):")
+    for i, state in enumerate(path):
+        print(f"Step {i}: {state}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from array import array
+from typing import List
+import numpy as np
+from puzzle_state import PackedState
+
+ACTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+NO_ACTION = -1
+NO_PARENT = -1
+
+class NodeStore:
+    """Search-tree nodes kept as columns instead of one Python object each.
+
+    A node is an integer id indexing typed arrays for its packed board,
+    blank position, parent id, action code (index into ACTIONS), depth, g
+    and h: 26 bytes per node instead of a few hundred for an object with a
+    NumPy board and references. Columns grow by appending, and columns()
+    returns NumPy copies of them for bulk analysis. The code column is
+    64-bit, so boards up to 4x4 fit.
+    """
+
+    def __init__(self, size: int = 3):
+        if not 2 <= size <= 4:
+            raise ValueError(f"NodeStore packs boards up to 4x4 into 64 bits, got size {size}")
+        self.size = size
+        self.code = array('Q')
+        self.blank = array('b')
+        self.parent = array('i')
+        self.action = array('b')
+        self.depth = array('i')
+        self.g = array('i')
+        self.h = array('i')
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def add(self, state: PackedState, parent: int = NO_PARENT, action: int = NO_ACTION,
+            g: int = 0, h: int = 0) -> int:
+        """Append a node and return its id"""
+        self.code.append(state.code)
+        self.blank.append(state.blank)
+        self.parent.append(parent)
+        self.action.append(action)
+        self.depth.append(self.depth[parent] + 1 if parent != NO_PARENT else 0)
+        self.g.append(g)
+        self.h.append(h)
+        return len(self.parent) - 1
+
+    def state(self, node: int) -> PackedState:
+        return PackedState(self.code[node], self.blank[node], self.size)
+
+    def action_name(self, node: int) -> str:
+        code = self.action[node]
+        return ACTIONS[code] if code != NO_ACTION else None
+
+    def path(self, node: int) -> List[int]:
+        """Node ids from the root down to node, following the parent column"""
+        nodes = []
+        while node != NO_PARENT:
+            nodes.append(node)
+            node = self.parent[node]
+        return nodes[::-1]
+
+    def children(self, node: int) -> List[int]:
+        """Ids of the nodes whose parent is node (a linear scan; prefer remembering ids)"""
+        return np.flatnonzero(self.columns()['parent'] == node).tolist()
+
+    def columns(self) -> dict:
+        """NumPy copies of every column (views would pin the buffers and make add() raise BufferError)"""
+        return {name: np.array(column, dtype=column.typecode)
+                for name, column in (('code', self.code), ('blank', self.blank), ('parent', self.parent),
+                                     ('action', self.action), ('depth', self.depth), ('g', self.g), ('h', self.h))}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in
+                   (self.code, self.blank, self.parent, self.action, self.depth, self.g, self.h))
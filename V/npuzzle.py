@@ -1,66 +1,78 @@
-import heapq
+import time
 import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import Rectangle
+from puzzle_state import PackedState, adjacent, direction, solvable
+from puzzle_heuristics import heuristic_table
+from ida_star import IDAStar
+from distance_table import distance_table
+from bucket_queue import BucketQueue
+from anytime_astar import ara_star, weighted_a_star
+from tree_render import draw_search_tree
 
 class PuzzleSolver:
+    # Blank moves in ascending position order, as in the original lookup table
+    MOVES = tuple(tuple(sorted(moves)) for moves in adjacent(3))
+
     def __init__(self, start, goal):
         self.start = start
         self.goal = goal
+        # Searches run on packed integer states; start/goal stay as given
+        self.start_state = PackedState.from_tiles(start, 3)
+        self.goal_state = PackedState.from_tiles(goal, 3)
+        # Misplaced-tile costs per (tile, position), updated per move in O(1)
+        self.table = heuristic_table(tuple(goal), 3, 'misplaced')
+        # Counters of the last search, read by the benchmark suite
+        self.stats = {}
     
     def heuristic(self, state):
         """Calculate the heuristic value (number of misplaced tiles)"""
-        return sum(1 for i in range(9) if state[i] != self.goal[i] and state[i] != 0)
+        return self.table.evaluate(state)
     
     def get_neighbors(self, state):
         """Generate possible moves by swapping the empty tile (0) with its neighbors"""
-        neighbors = []
-        idx = state.index(0)
-        moves = {
-            0: [1, 3], 1: [0, 2, 4], 2: [1, 5],
-            3: [0, 4, 6], 4: [1, 3, 5, 7], 5: [2, 4, 8],
-            6: [3, 7], 7: [4, 6, 8], 8: [5, 7]
-        }
-        
-        for move in moves[idx]:
-            new_state = list(state)
-            new_state[idx], new_state[move] = new_state[move], new_state[idx]
-            neighbors.append(tuple(new_state))
-        
-        return neighbors
+        return [state.move(move) for move in self.MOVES[state.blank]]
     
-    def a_star_search(self):
+    def a_star_search(self, plot=True):
         """A* Search Algorithm for 8-puzzle"""
-        priority_queue = []
-        heapq.heappush(priority_queue, (self.heuristic(self.start), 0, self.start, "Start"))
+        self.stats = {'nodes_expanded': 0, 'peak_frontier': 1}
+        if not solvable(self.start_state, self.goal_state):
+            return None, []  # Wrong parity class, no need to exhaust it
+        # Integer f-values; ties go to the deepest node, states are never compared
+        priority_queue = BucketQueue('high_g')
+        start = self.start_state
+        h_scores = {start: self.heuristic(start)}
+        priority_queue.push(h_scores[start], (0, start, "Start"), 0)
         visited = set()
-        parent = {self.start: (None, "Start")}
-        g_scores = {self.start: 0}
+        parent = {start: (None, "Start")}
+        g_scores = {start: 0}
         
         solution_path = []
         heuristic_values = []
         graph = nx.DiGraph()
         
-        graph.add_node(self.start, heuristic=self.heuristic(self.start))
+        graph.add_node(start, heuristic=h_scores[start])
         
         while priority_queue:
-            f_score, g_score, current, direction = heapq.heappop(priority_queue)
+            f_score, (g_score, current, direction) = priority_queue.pop()
             if current in visited:
                 continue
                 
             visited.add(current)
-            h_score = self.heuristic(current)
+            self.stats['nodes_expanded'] += 1
+            h_score = h_scores[current]
             heuristic_values.append(h_score)
             
-            if current == self.goal:
+            if current == self.goal_state:
                 path = []
                 while current:
-                    path.append((current, parent[current][1], self.heuristic(current), g_scores[current]))
+                    path.append((current.tiles(), parent[current][1], h_scores[current], g_scores[current]))
                     current = parent[current][0]
                 solution_path = path[::-1]
                 
-                self.plot_tree(graph, solution_path, heuristic_values, g_scores)
+                if plot:
+                    self.plot_tree(graph, solution_path, heuristic_values, g_scores)
                 return solution_path, heuristic_values
             
             for neighbor in self.get_neighbors(current):
@@ -70,17 +82,162 @@ class PuzzleSolver:
                 tentative_g_score = g_scores[current] + 1
                 
                 if neighbor not in g_scores or tentative_g_score < g_scores[neighbor]:
+                    if neighbor not in h_scores:
+                        h_scores[neighbor] = self.table.update(current, h_score, neighbor)
                     g_scores[neighbor] = tentative_g_score
-                    f_score = tentative_g_score + self.heuristic(neighbor)
-                    heapq.heappush(priority_queue, (f_score, tentative_g_score, neighbor, direction))
+                    f_score = tentative_g_score + h_scores[neighbor]
+                    priority_queue.push(f_score, (tentative_g_score, neighbor, direction), tentative_g_score)
                     parent[neighbor] = (current, direction)
+                    self.stats['peak_frontier'] = max(self.stats['peak_frontier'], len(priority_queue))
                     
                     if neighbor not in graph.nodes:
                         graph.add_edge(current, neighbor)
-                        graph.add_node(neighbor, heuristic=self.heuristic(neighbor))
+                        graph.add_node(neighbor, heuristic=h_scores[neighbor])
         
         return None, heuristic_values
 
+    def bidirectional_search(self):
+        """Bidirectional A* (MM) for 8-puzzle, returning the same (path, heuristic_values) as a_star_search.
+
+        One frontier grows from the start and one from the goal. Nodes are
+        ordered by max(f, 2g), so neither side expands a node past the
+        midpoint of an optimal path, and the search stops once the best
+        start-goal connection found so far is no longer than the smallest
+        priority left in either frontier.
+        """
+        self.stats = {'nodes_expanded': 0, 'peak_frontier': 2}
+        if not solvable(self.start_state, self.goal_state):
+            return None, []
+        ends = (self.start_state, self.goal_state)
+        # The backward search aims at the start state with the same heuristic
+        tables = (self.table, heuristic_table(tuple(self.start), 3, 'misplaced'))
+        g_scores = ({ends[0]: 0}, {ends[1]: 0})
+        h_scores = ({ends[0]: tables[0].evaluate(ends[0])}, {ends[1]: tables[1].evaluate(ends[1])})
+        parent = ({ends[0]: None}, {ends[1]: None})
+        frontier = (BucketQueue('high_g'), BucketQueue('high_g'))
+        for side in (0, 1):
+            frontier[side].push(h_scores[side][ends[side]], (0, ends[side]), 0)
+        closed = (set(), set())
+        heuristic_values = []
+        best, meet = (0, ends[0]) if ends[0] == ends[1] else (float('inf'), None)
+
+        while frontier[0] and frontier[1]:
+            for side in (0, 1):  # Drop entries superseded by a cheaper path
+                queue = frontier[side]
+                while queue:
+                    g_top, top = queue.peek()[1]
+                    if top not in closed[side] and g_top == g_scores[side][top]:
+                        break
+                    queue.pop()
+            if not frontier[0] or not frontier[1]:
+                break
+            side = 0 if frontier[0].min_key() <= frontier[1].min_key() else 1
+            if best <= frontier[side].min_key():
+                break
+            _, (g_score, current) = frontier[side].pop()
+            closed[side].add(current)
+            heuristic_values.append(h_scores[side][current])
+            self.stats['nodes_expanded'] += 1
+            other = 1 - side
+
+            for neighbor in self.get_neighbors(current):
+                tentative_g_score = g_score + 1
+                if neighbor in g_scores[side] and g_scores[side][neighbor] <= tentative_g_score:
+                    continue
+                g_scores[side][neighbor] = tentative_g_score
+                parent[side][neighbor] = current
+                closed[side].discard(neighbor)
+                if neighbor not in h_scores[side]:
+                    h_scores[side][neighbor] = tables[side].update(current, h_scores[side][current], neighbor)
+                priority = max(tentative_g_score + h_scores[side][neighbor], 2 * tentative_g_score)
+                frontier[side].push(priority, (tentative_g_score, neighbor), tentative_g_score)
+                self.stats['peak_frontier'] = max(self.stats['peak_frontier'], len(frontier[0]) + len(frontier[1]))
+                if neighbor in g_scores[other] and tentative_g_score + g_scores[other][neighbor] < best:
+                    best = tentative_g_score + g_scores[other][neighbor]
+                    meet = neighbor
+
+        if meet is None:
+            return None, heuristic_values
+        states = []
+        node = meet
+        while node is not None:
+            states.append(node)
+            node = parent[0][node]
+        states.reverse()
+        node = parent[1][meet]
+        while node is not None:
+            states.append(node)
+            node = parent[1][node]
+
+        return self.solution_steps(states), heuristic_values
+
+    def solution_steps(self, states):
+        """(state, direction, h, g) tuples for a list of packed states from start to goal"""
+        h_score = self.heuristic(states[0])
+        solution_path = [(states[0].tiles(), "Start", h_score, 0)]
+        for g in range(1, len(states)):
+            h_score = self.table.update(states[g - 1], h_score, states[g])
+            move = direction(states[g - 1].blank, states[g].blank, 3)
+            solution_path.append((states[g].tiles(), move, h_score, g))
+        return solution_path
+
+    def weighted_a_star_search(self, weight=2.0):
+        """Weighted A* (f = g + w*h): faster, and at most w times longer than the optimal path"""
+        self.stats = {}
+        if not solvable(self.start_state, self.goal_state):
+            return None
+        path = weighted_a_star(self.start_state, self.goal_state, self.table, self.get_neighbors, weight, self.stats)
+        return self.solution_steps(path) if path else None
+
+    def anytime_search(self, time_limit=1.0, weight=3.0, step=0.5):
+        """ARA*: yield (solution_path, bound) with ever shorter paths until time_limit seconds have passed.
+
+        The first solution comes from weighted A* with the given weight; each
+        later one lowers the weight by step and repairs the previous search.
+        bound is how many times longer than optimal the path can at most be,
+        and the last yield has bound 1 if the time limit allowed it.
+        """
+        self.stats = {}
+        if not solvable(self.start_state, self.goal_state):
+            return
+        deadline = time.perf_counter() + time_limit
+        for path, bound in ara_star(self.start_state, self.goal_state, self.table, self.get_neighbors,
+                                    weight, step, deadline, self.stats):
+            yield self.solution_steps(path), bound
+
+    def ida_star_search(self):
+        """IDA* Search for 8-puzzle, same path format as a_star_search but O(depth) memory"""
+        search = IDAStar(self.start_state, self.goal_state, self.table)
+        # No 8-puzzle position needs more than 31 moves
+        path = search.search(max_bound=31)
+        # The only frontier is the current branch
+        self.stats = {'nodes_expanded': search.nodes_expanded, 'peak_frontier': max(search.bounds, default=0)}
+        print(f"Nodes expanded: {search.nodes_expanded} ({search.nodes_per_second:,.0f} nodes/s)")
+        if path is None:
+            return None
+        solution_path = [(path[0][0].tiles(), "Start", path[0][1], 0)]
+        for g in range(1, len(path)):
+            (prev, _), (state, h) = path[g - 1], path[g]
+            solution_path.append((state.tiles(), direction(prev.blank, state.blank, 3), h, g))
+        return solution_path
+
+    def table_search(self):
+        """Optimal path from a precomputed distance-to-goal table, in a_star_search's path format.
+
+        The table holds the exact distance of all 181,440 states of the goal's
+        parity class; it is built once per goal and cached on disk, after which
+        every query is a walk down the distances in O(solution length).
+        """
+        path = distance_table(tuple(self.goal)).solve(self.start_state)
+        self.stats = {'nodes_expanded': len(path) if path else 0, 'peak_frontier': 0}
+        if path is None:
+            return None
+        solution_path = []
+        for g, state in enumerate(path):
+            move = direction(path[g - 1].blank, state.blank, 3) if g else "Start"
+            solution_path.append((state.tiles(), move, self.heuristic(state), g))
+        return solution_path
+
     @staticmethod
     def get_input():
         """Get user input for 8-puzzle initial and goal state in matrix form"""
@@ -101,9 +258,21 @@ class PuzzleSolver:
         print(f"| Heuristic: {heuristic_value:<3}  Cost (g): {g_score:<3}  f = {heuristic_value + g_score:<3} |")
         print(f"+{'-' * 31}+\n")
 
-    def plot_tree(self, graph, solution_path, heuristic_values, g_scores):
-        """Visualize the puzzle search tree with matrix representation in a hierarchical layout"""
+    def plot_tree(self, graph, solution_path, heuristic_values, g_scores, detail_limit=50):
+        """Visualize the puzzle search tree with matrix representation in a hierarchical layout.
+
+        Trees with more than detail_limit nodes are drawn in level-of-detail
+        mode: subtrees off the solution path collapse into counts and the
+        boards are drawn in batches, so the artist count stays bounded.
+        """
         fig, ax = plt.subplots(figsize=(15, 12))
+        solution_nodes = [PackedState.from_tiles(step[0], 3) for step in solution_path]
+        if graph.number_of_nodes() > detail_limit:
+            draw_search_tree(ax, graph, self.start_state, solution_nodes, PackedState.tiles, 3,
+                             node_text=lambda node: f'H: {graph.nodes[node]["heuristic"]} g: {g_scores[node]}')
+            plt.title(f"8-Puzzle State Space Tree (A* Search) - {graph.number_of_nodes()} nodes, off-path subtrees collapsed")
+            plt.show()
+            return
         
         # Calculate positions based on hierarchy (g_score as y-level)
         pos = {}
@@ -130,14 +299,13 @@ class PuzzleSolver:
         nx.draw_networkx_edges(graph, pos, ax=ax, arrows=True, alpha=0.6)
         
         # Highlight solution path
-        solution_nodes = [step[0] for step in solution_path]
         edges = [(solution_nodes[i], solution_nodes[i+1]) for i in range(len(solution_nodes) - 1)]
         nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color='red', width=2, ax=ax)
 
         # Draw nodes as matrices
         node_size = 0.3
         for node, (x, y) in pos.items():
-            matrix = np.array(node).reshape(3, 3)
+            matrix = node.to_array()
             matrix_display = np.where(matrix == 0, '', matrix)
             
             rect = Rectangle((x - node_size/2, y - node_size/2), node_size, node_size, 
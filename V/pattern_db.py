@@ -0,0 +1,207 @@
+import os
+import tempfile
+from math import perm
+from typing import Sequence, Tuple, List
+import numpy as np
+from puzzle_state import PackedState
+
+# Table files live here unless a directory is passed explicitly
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_cache')
+
+UNSEEN = 255
+CHUNK = 1 << 20  # Rows expanded at once while building a table
+
+def default_partition(goal: Sequence[int], size: int) -> List[Tuple[int, ...]]:
+    """Disjoint tile groups in goal order: 4-4 for 3x3, 6-6-3 for 4x4, 5-5-5-5-4 for 5x5"""
+    chunk = {3: 4, 4: 6}.get(size, 5)
+    tiles = [t for t in goal if t != 0]
+    return [tuple(tiles[i:i + chunk]) for i in range(0, len(tiles), chunk)]
+
+def rank_placements(positions: np.ndarray, n: int) -> np.ndarray:
+    """Perfect hash of k distinct cells out of n, vectorised over rows.
+
+    Ranks run over 0 .. n!/(n-k)! - 1 (Lehmer code of a partial permutation).
+    """
+    pos = positions.astype(np.int64)
+    rank = np.zeros(pos.shape[0], dtype=np.int64)
+    for i in range(pos.shape[1]):
+        smaller = np.zeros(pos.shape[0], dtype=np.int64)
+        for j in range(i):
+            smaller += pos[:, j] < pos[:, i]
+        rank = rank * (n - i) + (pos[:, i] - smaller)
+    return rank
+
+def rank_placement(positions: Sequence[int], n: int) -> int:
+    """Scalar rank_placements for a single placement"""
+    rank = 0
+    for i, p in enumerate(positions):
+        smaller = 0
+        for j in range(i):
+            if positions[j] < p:
+                smaller += 1
+        rank = rank * (n - i) + p - smaller
+    return rank
+
+def _moves(states: np.ndarray, size: int, k: int):
+    """Blank moves of (m, k + 1) rows of pattern cells plus the blank's cell.
+
+    Returns (free, pattern): children where the blank swapped with a
+    non-pattern cell (cost 0) and children where it swapped with a pattern
+    tile (cost 1).
+    """
+    n = size * size
+    blank = states[:, k]
+    free, pattern = [], []
+    for delta, legal in ((-size, blank >= size), (size, blank < n - size),
+                         (-1, blank % size > 0), (1, blank % size < size - 1)):
+        target = blank + delta
+        match = states[:, :k] == target[:, None]
+        hit = match.any(axis=1)
+        child = states[legal & ~hit].copy()
+        child[:, k] = target[legal & ~hit]
+        free.append(child)
+        rows = np.flatnonzero(legal & hit)
+        child = states[rows].copy()
+        child[np.arange(rows.size), match[rows].argmax(axis=1)] = blank[rows]
+        child[:, k] = target[rows]
+        pattern.append(child)
+    return np.concatenate(free), np.concatenate(pattern)
+
+def _fresh(states: np.ndarray, seen: np.ndarray, n: int) -> np.ndarray:
+    """Rows not seen yet, deduplicated, and mark them seen"""
+    ranks, first = np.unique(rank_placements(states, n), return_index=True)
+    new = ~seen[ranks]
+    seen[ranks[new]] = True
+    return states[first[new]]
+
+def build_pattern_table(goal: Sequence[int], size: int, tiles: Sequence[int]) -> np.ndarray:
+    """Retrograde 0-1 BFS over the placements of one pattern's tiles and the blank.
+
+    Only moves of pattern tiles are counted; the blank trading places with
+    any other tile is free, which is what makes the tables of a partition
+    additive. Each stored entry is the minimum over the blank's cells, so
+    the table is indexed by the tile placement alone. A level is first
+    closed under free moves, then its pattern moves give the next level,
+    in chunks of CHUNK rows of an (m, k + 1) array of cells.
+    """
+    n = size * size
+    k = len(tiles)
+    seen = np.zeros(perm(n, k + 1), dtype=bool)
+    table = np.full(perm(n, k), UNSEEN, dtype=np.uint8)
+    goal = list(goal)
+    frontier = _fresh(np.array([[goal.index(t) for t in tiles] + [goal.index(0)]], dtype=np.int8), seen, n)
+    depth = 0
+
+    while frontier.size:
+        following = []
+        pending = [frontier]
+        while pending:
+            states = pending.pop()
+            for first in range(0, len(states), CHUNK):
+                chunk = states[first:first + CHUNK]
+                ranks = rank_placements(chunk[:, :k], n)
+                table[ranks[table[ranks] == UNSEEN]] = depth
+                free, pattern = _moves(chunk, size, k)
+                free = _fresh(free, seen, n)
+                if len(free):
+                    pending.append(free)
+                following.append(pattern[~seen[rank_placements(pattern, n)]])
+        # Every state at this depth is marked now, so unseen pattern children are one deeper
+        frontier = _fresh(np.concatenate(following), seen, n)
+        depth += 1
+    return table
+
+def table_path(goal: Sequence[int], size: int, tiles: Sequence[int], directory: str = None) -> str:
+    goal_name = '-'.join(map(str, goal))
+    tile_name = '-'.join(map(str, tiles))
+    return os.path.join(directory or CACHE_DIR, f'pdb_{size}x{size}_{goal_name}_{tile_name}_blank.bin')
+
+def write_table(path: str, table: np.ndarray) -> None:
+    """Write a table file atomically, creating its directory if needed"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A private temporary name, so concurrent builders never write into each other's file
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            table.tofile(f)
+        os.replace(temp_path, path)  # Readers never see a half-written file
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def build_pdb(goal: Sequence[int], size: int, partition=None, directory: str = None) -> List[str]:
+    """Build and write every table of a partition; existing files are kept"""
+    partition = partition or default_partition(goal, size)
+    paths = []
+    for tiles in partition:
+        path = table_path(goal, size, tiles, directory)
+        if not os.path.exists(path):
+            write_table(path, build_pattern_table(goal, size, tiles))
+        paths.append(path)
+    return paths
+
+class AdditivePDB:
+    """Sum of disjoint pattern-database lookups, usable like a HeuristicTable.
+
+    Tables are raw byte files that are memory-mapped read-only on first use,
+    so several solver processes share the same pages. Missing tables are
+    built on that first use. The cells of every pattern's tiles are kept
+    per state code (up to CELL_CACHE states), so update() reads the
+    parent's cells instead of scanning its board.
+    """
+
+    CELL_CACHE = 1 << 18
+
+    def __init__(self, goal: Sequence[int], size: int, partition=None, directory: str = None):
+        self.goal = tuple(goal)
+        self.size = size
+        self.partition = [tuple(p) for p in (partition or default_partition(self.goal, size))]
+        self.directory = directory
+        self.tables = None
+        # Which pattern (and slot within it) each tile belongs to
+        self.owner = {tile: (p, i) for p, tiles in enumerate(self.partition) for i, tile in enumerate(tiles)}
+        self.cells = {}  # State code -> cells of each pattern's tiles
+
+    def _load(self):
+        paths = build_pdb(self.goal, self.size, self.partition, self.directory)
+        self.tables = [np.memmap(path, dtype=np.uint8, mode='r') for path in paths]
+
+    def _pattern_value(self, p: int, cells: Sequence[int]) -> int:
+        return int(self.tables[p][rank_placement(cells, self.size * self.size)])
+
+    def _remember(self, code: int, cells: tuple) -> None:
+        if len(self.cells) >= self.CELL_CACHE:
+            self.cells.clear()
+        self.cells[code] = cells
+
+    def _pattern_cells(self, state: PackedState) -> tuple:
+        cells = self.cells.get(state.code)
+        if cells is None:
+            found = [[0] * len(tiles) for tiles in self.partition]
+            for pos, tile in enumerate(state.tiles()):
+                if tile in self.owner:
+                    p, i = self.owner[tile]
+                    found[p][i] = pos
+            cells = tuple(map(tuple, found))
+            self._remember(state.code, cells)
+        return cells
+
+    def evaluate(self, state: PackedState) -> int:
+        if self.tables is None:
+            self._load()
+        return sum(self._pattern_value(p, c) for p, c in enumerate(self._pattern_cells(state)))
+
+    def update(self, parent: PackedState, h: int, child: PackedState) -> int:
+        """Only the pattern owning the moved tile changes its lookup"""
+        if self.tables is None:
+            self._load()
+        tile = parent.tile_at(child.blank)  # The tile that slid into the parent's blank
+        parent_cells = self._pattern_cells(parent)
+        if tile not in self.owner:
+            self._remember(child.code, parent_cells)
+            return h
+        p, slot = self.owner[tile]
+        before = parent_cells[p]
+        after = before[:slot] + (parent.blank,) + before[slot + 1:]
+        self._remember(child.code, parent_cells[:p] + (after,) + parent_cells[p + 1:])
+        return h - self._pattern_value(p, before) + self._pattern_value(p, after)
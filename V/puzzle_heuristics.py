@@ -0,0 +1,112 @@
+from functools import lru_cache
+from math import isqrt
+from typing import Sequence, Tuple
+from puzzle_state import PackedState
+from pattern_db import AdditivePDB
+
+class HeuristicTable:
+    """Precomputed (tile, position) -> cost table for one goal.
+
+    kind='manhattan' stores the Manhattan distance of each tile from its goal
+    cell, kind='misplaced' stores 1 when a tile is off its goal cell. A full
+    evaluation is a sum of table lookups, and after a move only the moved
+    tile changes, so update() is O(1).
+    """
+
+    def __init__(self, goal: Sequence[int], size: int = None, kind: str = 'manhattan'):
+        goal = tuple(int(t) for t in goal)
+        self.size = size or isqrt(len(goal))
+        self.kind = kind
+        n = self.size * self.size
+        self.goal_pos = [0] * n
+        for pos, tile in enumerate(goal):
+            self.goal_pos[tile] = pos
+        # table[tile * n + pos]; the blank never contributes
+        self.table = [0] * (n * n)
+        for tile in range(1, n):
+            goal_row, goal_col = divmod(self.goal_pos[tile], self.size)
+            for pos in range(n):
+                row, col = divmod(pos, self.size)
+                if kind == 'misplaced':
+                    cost = int(pos != self.goal_pos[tile])
+                else:
+                    cost = abs(row - goal_row) + abs(col - goal_col)
+                self.table[tile * n + pos] = cost
+
+    def evaluate(self, state: PackedState) -> int:
+        """Full O(n) evaluation, only needed for the root of a search"""
+        n = self.size * self.size
+        table = self.table
+        return sum(table[tile * n + pos] for pos, tile in enumerate(state.tiles()))
+
+    def update(self, parent: PackedState, h: int, child: PackedState) -> int:
+        """h of child, given h of the parent it was generated from.
+
+        The tile at child.blank slid into parent.blank; nothing else moved.
+        """
+        n = self.size * self.size
+        tile = parent.tile_at(child.blank)
+        return h + self.table[tile * n + parent.blank] - self.table[tile * n + child.blank]
+
+class LinearConflictTable(HeuristicTable):
+    """Manhattan distance plus the linear-conflict correction.
+
+    Two tiles whose goal cells are in their current row (or column) but in
+    the opposite order need two extra moves between them. Each line adds
+    2 * (tiles in their goal line - longest run already in goal order),
+    which stays admissible when one tile is in conflict with several.
+    A move only changes one row or column for the moved tile, so update()
+    recomputes at most two lines.
+    """
+
+    def __init__(self, goal: Sequence[int], size: int = None):
+        super().__init__(goal, size, kind='manhattan')
+
+    def _line_conflicts(self, state: PackedState, line: int, is_row: bool) -> int:
+        size = self.size
+        keys = []
+        for k in range(size):
+            pos = line * size + k if is_row else k * size + line
+            tile = state.tile_at(pos)
+            if tile == 0:
+                continue
+            goal_row, goal_col = divmod(self.goal_pos[tile], size)
+            if (goal_row if is_row else goal_col) == line:
+                keys.append(goal_col if is_row else goal_row)
+        # Longest increasing subsequence; lines have at most five tiles
+        best = [1] * len(keys)
+        for i in range(len(keys)):
+            for j in range(i):
+                if keys[j] < keys[i] and best[j] + 1 > best[i]:
+                    best[i] = best[j] + 1
+        return 2 * (len(keys) - max(best, default=0))
+
+    def conflicts(self, state: PackedState) -> int:
+        return sum(self._line_conflicts(state, line, is_row)
+                   for line in range(self.size) for is_row in (True, False))
+
+    def evaluate(self, state: PackedState) -> int:
+        return super().evaluate(state) + self.conflicts(state)
+
+    def update(self, parent: PackedState, h: int, child: PackedState) -> int:
+        h = super().update(parent, h, child)
+        old_row, old_col = divmod(child.blank, self.size)
+        new_row, new_col = divmod(parent.blank, self.size)
+        if old_row == new_row:
+            # Horizontal move: the tile changes column, rows keep their order
+            lines = [(old_col, False), (new_col, False)]
+        else:
+            lines = [(old_row, True), (new_row, True)]
+        for line, is_row in lines:
+            h += self._line_conflicts(child, line, is_row) - self._line_conflicts(parent, line, is_row)
+        return h
+
+@lru_cache(maxsize=64)
+def heuristic_table(goal: Tuple[int, ...], size: int = None, kind: str = 'manhattan') -> HeuristicTable:
+    """Tables are built once per goal and reused"""
+    if kind == 'pdb':
+        # Additive pattern databases, memory-mapped from disk on first use
+        return AdditivePDB(goal, size or isqrt(len(goal)))
+    if kind == 'linear_conflict':
+        return LinearConflictTable(goal, size)
+    return HeuristicTable(goal, size, kind)
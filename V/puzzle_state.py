@@ -0,0 +1,111 @@
+from functools import lru_cache
+from math import isqrt
+from typing import NamedTuple, Sequence, Tuple, List
+import numpy as np
+
+@lru_cache(maxsize=None)
+def tile_bits(size: int) -> int:
+    """Bits per tile: 4 is enough up to the 15-puzzle, 5 up to the 24-puzzle"""
+    return max(4, (size * size - 1).bit_length())
+
+@lru_cache(maxsize=None)
+def adjacent(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """For every blank position, the positions it can swap with (up, down, left, right)"""
+    table = []
+    for pos in range(size * size):
+        row, col = divmod(pos, size)
+        moves = []
+        if row > 0:
+            moves.append(pos - size)
+        if row < size - 1:
+            moves.append(pos + size)
+        if col > 0:
+            moves.append(pos - 1)
+        if col < size - 1:
+            moves.append(pos + 1)
+        table.append(tuple(moves))
+    return tuple(table)
+
+def direction(blank: int, pos: int, size: int) -> str:
+    """Name of the blank move that takes it from blank to pos"""
+    delta = pos - blank
+    if delta == -size:
+        return 'UP'
+    if delta == size:
+        return 'DOWN'
+    return 'LEFT' if delta == -1 else 'RIGHT'
+
+class PackedState(NamedTuple):
+    """Puzzle board packed into a single integer.
+
+    Tile i lives in bits [b*i, b*i + b) of code, with b = tile_bits(size), and
+    the blank (0) position is stored alongside so moves never scan the board.
+    Hashing and equality work on three small ints instead of a whole board.
+    """
+    code: int
+    blank: int
+    size: int = 3
+
+    @classmethod
+    def from_tiles(cls, tiles: Sequence[int], size: int = None) -> 'PackedState':
+        """Pack a flat, row-major sequence of tiles"""
+        tiles = [int(t) for t in tiles]
+        if size is None:
+            size = isqrt(len(tiles))
+        bits = tile_bits(size)
+        code = 0
+        for pos, tile in enumerate(tiles):
+            code |= tile << (bits * pos)
+        return cls(code, tiles.index(0), size)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'PackedState':
+        """Pack a square 2-D board"""
+        array = np.asarray(array)
+        return cls.from_tiles(array.flatten().tolist(), array.shape[0])
+
+    def tile_at(self, pos: int) -> int:
+        bits = tile_bits(self.size)
+        return (self.code >> (bits * pos)) & ((1 << bits) - 1)
+
+    def tiles(self) -> Tuple[int, ...]:
+        """Unpack into a flat, row-major tuple"""
+        bits = tile_bits(self.size)
+        mask = (1 << bits) - 1
+        code = self.code
+        return tuple((code >> (bits * pos)) & mask for pos in range(self.size * self.size))
+
+    def to_array(self) -> np.ndarray:
+        return np.array(self.tiles()).reshape(self.size, self.size)
+
+    def move(self, pos: int) -> 'PackedState':
+        """Slide the tile at pos into the blank with two xors"""
+        bits = tile_bits(self.size)
+        tile = (self.code >> (bits * pos)) & ((1 << bits) - 1)
+        code = self.code ^ (tile << (bits * pos)) ^ (tile << (bits * self.blank))
+        return PackedState(code, pos, self.size)
+
+    def neighbors(self) -> List['PackedState']:
+        """Every state one blank move away, in up/down/left/right order"""
+        return [self.move(pos) for pos in adjacent(self.size)[self.blank]]
+
+def solvable(start: PackedState, goal: PackedState) -> bool:
+    """Whether goal is reachable from start.
+
+    Every move is one transposition and shifts the blank by one cell, so the
+    parity of the tile permutation between the two boards must match the
+    parity of the blank's taxicab distance.
+    """
+    size = start.size
+    where = {tile: pos for pos, tile in enumerate(goal.tiles())}
+    perm = [where[tile] for tile in start.tiles()]
+    seen = [False] * len(perm)
+    cycles = 0
+    for i in range(len(perm)):
+        if not seen[i]:
+            cycles += 1
+            while not seen[i]:
+                seen[i] = True
+                i = perm[i]
+    (r0, c0), (r1, c1) = divmod(start.blank, size), divmod(goal.blank, size)
+    return (len(perm) - cycles) % 2 == (abs(r0 - r1) + abs(c0 - c1)) % 2
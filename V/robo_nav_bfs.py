@@ -1,43 +1,79 @@
-import heapq
 import time
 import matplotlib.pyplot as plt
 import numpy as np
+from grid_search import GridMap
+from distance_field import DistanceFieldCache
+from hpa_star import HPAStar
+from batch_planner import BatchPlanner
 
 def a_star_search(grid, start, goal, visualize=False, delay=0.1):
     """
     Perform A* Search on a grid to find the shortest path from start to goal.
     Optionally visualize search progress step-by-step.
-    """
-    rows, cols = len(grid), len(grid[0])
-    open_list = [(manhattan_distance(start, goal), 0, start, [start])]
-    closed_set = set()
-    nodes_expanded = 0
-    visited_path = set()
 
-    while open_list:
-        _, g, current, path = heapq.heappop(open_list)
+    The search runs on grid_search.GridMap: flat cell indices and int32
+    g/parent arrays, with the path rebuilt only for the goal (and, when
+    visualizing, for each expanded cell).
+    """
+    grid_map = GridMap(grid)
+    stats = {}
+    on_expand = None
+    if visualize:
+        visited_path = set()
 
-        if current == goal:
-            return path, nodes_expanded
+        def on_expand(index, parent):
+            visited_path.add(grid_map.cell(index))
+            visualize_search_progress(grid, visited_path, grid_map.path_to(parent, index), start, goal, delay)
 
-        if current in closed_set:
-            continue
+    path = grid_map.a_star(start, goal, stats, on_expand)
+    return path, stats['nodes_expanded']
 
-        closed_set.add(current)
-        visited_path.add(current)
-        nodes_expanded += 1
+def jump_point_search(grid, start, goal, precomputed=False):
+    """
+    Jump Point Search on the same grid, start and goal as a_star_search.
+    Returns the same (path, nodes_expanded), where the nodes are jump points.
+    With precomputed=True the jumps come from a JPS+ jump-distance table;
+    to reuse that table across queries, keep a grid_search.GridMap and call
+    its jump_point_search directly.
+    """
+    stats = {}
+    path = GridMap(grid).jump_point_search(start, goal, stats, precomputed)
+    return path, stats['nodes_expanded']
 
-        if visualize:
-            visualize_search_progress(grid, visited_path, path, start, goal, delay)
+def hierarchical_search(grid, start, goal, cluster_size=32):
+    """
+    Near-optimal path by HPA* for very large grids. Returns (path,
+    nodes_expanded), the nodes being abstract-graph nodes. The abstract
+    graph is rebuilt on every call; for repeated queries or map changes
+    keep an hpa_star.HPAStar and call its search and set_blocked.
+    """
+    stats = {}
+    path = HPAStar(GridMap(grid), cluster_size).search(start, goal, stats)
+    return path, stats['nodes_expanded']
 
-        for neighbor in get_neighbors(current, grid, rows, cols):
-            if neighbor not in closed_set:
-                new_path = path + [neighbor]
-                new_g = g + 1
-                f = new_g + manhattan_distance(neighbor, goal)
-                heapq.heappush(open_list, (f, new_g, neighbor, new_path))
+def paths_to_goal(grid, starts, goal, cache=None):
+    """
+    Shortest paths from many starts to one goal (e.g. a dock cell), in order.
+    One distance field is computed for the goal and each path is read off
+    it in O(path length); None marks an unreachable start. Pass a
+    distance_field.DistanceFieldCache together with a grid_search.GridMap
+    as grid to keep the field between calls.
+    """
+    grid_map = grid if isinstance(grid, GridMap) else GridMap(grid)
+    cache = DistanceFieldCache(1) if cache is None else cache
+    return [cache.path(grid_map, start, goal) for start in starts]
 
-    return None, nodes_expanded
+def batch_paths(grid, queries, workers=None):
+    """
+    A* paths for many (start, goal) pairs on one grid, in query order,
+    planned by a process pool reading the grid from shared memory.
+    Returns (paths, stats) where stats has queries, seconds and
+    queries_per_second. Keep a batch_planner.BatchPlanner open to reuse
+    the pool across batches or to stream results as they finish.
+    """
+    with BatchPlanner(grid, workers) as planner:
+        paths = planner.plan_all(queries)
+        return paths, planner.stats
 
 def manhattan_distance(pos1, pos2):
     return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
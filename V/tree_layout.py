@@ -0,0 +1,142 @@
+from collections import deque
+
+def tidy_tree_layout(graph, root, dx=1.0, dy=1.0):
+    """Reingold-Tilford style tidy layout of the tree hanging from root.
+
+    Uses the linear-time formulation of Buchheim, Juenger and Leipert, run
+    with explicit orders instead of recursion so deep trees never hit the
+    recursion limit. Edges to already placed nodes are ignored, so a search
+    graph is laid out as its BFS spanning tree.
+
+    Args:
+        graph: Any object with a networkx-style neighbors(node) method
+        root: Node at the top of the tree
+        dx: Horizontal distance between neighbouring nodes
+        dy: Vertical distance between levels
+
+    Returns:
+        (pos, depths): node -> (x, y) and node -> depth, both computed in the
+        same O(n) pass
+    """
+    # Number the nodes in BFS order; children always come after their parent
+    nodes = [root]
+    index = {root: 0}
+    parent = [-1]
+    children = [[]]
+    depth = [0]
+    queue = deque([0])
+    while queue:
+        v = queue.popleft()
+        for node in graph.neighbors(nodes[v]):
+            if node in index:
+                continue
+            w = len(nodes)
+            index[node] = w
+            nodes.append(node)
+            parent.append(v)
+            children.append([])
+            depth.append(depth[v] + 1)
+            children[v].append(w)
+            queue.append(w)
+
+    n = len(nodes)
+    number = [0] * n  # Position among siblings
+    for kids in children:
+        for i, w in enumerate(kids):
+            number[w] = i
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    change = [0.0] * n
+    shift = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+
+    def next_left(v):
+        return children[v][0] if children[v] else thread[v]
+
+    def next_right(v):
+        return children[v][-1] if children[v] else thread[v]
+
+    def move_subtree(wl, wr, amount):
+        subtrees = number[wr] - number[wl]
+        change[wr] -= amount / subtrees
+        shift[wr] += amount
+        change[wl] += amount / subtrees
+        prelim[wr] += amount
+        mod[wr] += amount
+
+    def apportion(v, default_ancestor):
+        """Push v's subtree right until it clears the subtrees to its left"""
+        siblings = children[parent[v]]
+        if number[v] == 0:
+            return default_ancestor
+        vir = vor = v
+        vil = siblings[number[v] - 1]
+        vol = siblings[0]
+        sir = sor = mod[v]
+        sil = mod[vil]
+        sol = mod[vol]
+        while next_right(vil) != -1 and next_left(vir) != -1:
+            vil = next_right(vil)
+            vir = next_left(vir)
+            vol = next_left(vol)
+            vor = next_right(vor)
+            ancestor[vor] = v
+            amount = (prelim[vil] + sil) - (prelim[vir] + sir) + dx
+            if amount > 0:
+                a = ancestor[vil]
+                wl = a if parent[a] == parent[v] else default_ancestor
+                move_subtree(wl, v, amount)
+                sir += amount
+                sor += amount
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) != -1 and next_right(vor) == -1:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        else:
+            if next_left(vir) != -1 and next_left(vol) == -1:
+                thread[vol] = next_left(vir)
+                mod[vol] += sir - sol
+            default_ancestor = v
+        return default_ancestor
+
+    # First walk, bottom-up: place each node's children relative to each other
+    for v in range(n - 1, -1, -1):
+        kids = children[v]
+        if not kids:
+            continue
+        default_ancestor = kids[0]
+        for i, w in enumerate(kids):
+            if children[w]:
+                midpoint = (prelim[children[w][0]] + prelim[children[w][-1]]) / 2
+                if i:
+                    prelim[w] = prelim[kids[i - 1]] + dx
+                    mod[w] = prelim[w] - midpoint
+                else:
+                    prelim[w] = midpoint
+            else:
+                prelim[w] = prelim[kids[i - 1]] + dx if i else 0.0
+            default_ancestor = apportion(w, default_ancestor)
+        # Execute the shifts collected by move_subtree
+        total_shift = total_change = 0.0
+        for w in reversed(kids):
+            prelim[w] += total_shift
+            mod[w] += total_shift
+            total_change += change[w]
+            total_shift += shift[w] + total_change
+    if children[0]:
+        prelim[0] = (prelim[children[0][0]] + prelim[children[0][-1]]) / 2
+
+    # Second walk, top-down: add up the modifiers of all ancestors
+    offset = [0.0] * n
+    pos = {}
+    depths = {}
+    for v in range(n):
+        if v:
+            offset[v] = offset[parent[v]] + mod[parent[v]]
+        pos[nodes[v]] = (prelim[v] + offset[v], -depth[v] * dy)
+        depths[nodes[v]] = depth[v]
+    return pos, depths
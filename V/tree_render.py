@@ -0,0 +1,202 @@
+from collections import Counter, deque
+import math
+import numpy as np
+import networkx as nx
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+from tree_layout import tidy_tree_layout
+
+START_COLOR = 'green'
+GOAL_COLOR = 'red'
+PATH_COLOR = 'gold'
+OTHER_COLOR = 'gray'
+COLLAPSED_COLOR = 'lightgray'
+
+def collapse_tree(children, root, path, max_boards):
+    """Choose the boards to draw and fold everything else into per-parent counts.
+
+    One breadth-first pass from all path nodes at once (the path edges are
+    fixed) spans the search graph, so every node hangs off the part of the
+    path it is closest to. The first max_boards nodes reached, path
+    included, are kept; every later node is charged to its nearest kept
+    ancestor, which gets one collapsed entry holding the number of nodes it
+    hides. No per-subtree sizes are needed, so the pass is a single visit of
+    each node and edge.
+
+    Args:
+        children: Mapping node -> iterable of successors
+        root: Start node of the search
+        path: Solution path from root, may be empty
+        max_boards: Number of nodes to keep
+
+    Returns:
+        (tree, collapsed, count): kept node -> list of kept tree children,
+        kept node -> number of hidden descendants, and the number of nodes
+    """
+    path = list(path) or [root]
+    tree = {node: [] for node in path}
+    for a, b in zip(path, path[1:]):
+        tree[a].append(b)
+    owner = dict.fromkeys(path)  # Node -> kept ancestor it is folded into, None if kept
+    room = max_boards - len(tree)
+    queue = deque(path)
+    while queue:
+        node = queue.popleft()
+        charge = owner[node]
+        if charge is None:
+            kids = tree[node]
+            for child in children.get(node, ()):
+                if child not in owner:
+                    if room > 0:
+                        owner[child] = None
+                        tree[child] = []
+                        kids.append(child)
+                        room -= 1
+                    else:
+                        owner[child] = node
+                    queue.append(child)
+        else:
+            for child in children.get(node, ()):
+                if child not in owner:
+                    owner[child] = charge
+                    queue.append(child)
+    collapsed = Counter(owner.values())
+    del collapsed[None]
+    return tree, collapsed, len(owner)
+
+def draw_search_tree(ax, children, root, path, tiles, size=3, max_nodes=200, max_labels=300,
+                     node_text=None, legend=True):
+    """Level-of-detail drawing of a puzzle search tree with a bounded number of artists.
+
+    Subtrees off the solution path are collapsed into count markers until at
+    most max_nodes boards and markers remain. The boards are drawn as one
+    PolyCollection of tile cells, the edges as two LineCollections and the
+    markers as one scatter; the only per-node artists are text labels, at
+    most max_labels of them (path tiles first, then the collapsed counts,
+    then node_text, then the other tiles). Drawing time is therefore
+    bounded whatever the size of the tree; only collapse_tree's single
+    visit of every node is linear in it.
+
+    Args:
+        ax: Matplotlib axes to draw on
+        children: Mapping node -> successors, e.g. a dict of lists, or a
+            networkx DiGraph (read through its adjacency dicts)
+        root: Start node
+        path: Solution path from root, may be empty
+        tiles: Function node -> flat sequence of size * size tiles, 0 the blank
+        size: Board width
+        max_nodes: Cap on boards plus collapsed markers
+        max_labels: Cap on text artists
+        node_text: Optional function node -> caption under the board
+        legend: Whether to add the colour legend
+
+    Returns:
+        dict with the tree's node count, boards drawn, nodes collapsed and text labels used
+    """
+    path = list(path)
+    if isinstance(children, nx.Graph):
+        children = dict(children.adjacency())
+    tree, collapsed, total = collapse_tree(children, root, path, max(len(path), max_nodes // 2))
+
+    # Lay out the kept tree with one extra leaf per collapsed group
+    layout = nx.DiGraph()
+    layout.add_node(root)
+    for node, kids in tree.items():
+        layout.add_edges_from((node, child) for child in kids)
+        if node in collapsed:
+            layout.add_edge(node, ('collapsed', node))
+    pos, _ = tidy_tree_layout(layout, root, dx=1.2, dy=1.6)
+
+    boards = list(tree)
+    on_path = set(path)
+    board = 0.9
+    cell = board / size
+
+    # Every tile cell of every board in one collection
+    xy = np.array([pos[node] for node in boards])
+    values = np.array([list(tiles(node)) for node in boards], dtype=int)
+    rows, cols = np.divmod(np.arange(size * size), size)
+    left = xy[:, :1] - board / 2 + cols * cell
+    top = xy[:, 1:] + board / 2 - rows * cell
+    corners = np.stack([np.stack([left, top - cell], -1), np.stack([left + cell, top - cell], -1),
+                        np.stack([left + cell, top], -1), np.stack([left, top], -1)], axis=2)
+    cmap = plt.get_cmap('tab20')
+    faces = cmap((values - 1) % cmap.N)
+    faces[values == 0] = (1, 1, 1, 1)
+    ax.add_collection(PolyCollection(corners.reshape(-1, 4, 2), facecolors=faces.reshape(-1, 4),
+                                     edgecolors='white', linewidths=0.3))
+
+    def outline_color(node):
+        if node == root:
+            return START_COLOR
+        if path and node == path[-1]:
+            return GOAL_COLOR
+        return PATH_COLOR if node in on_path else OTHER_COLOR
+    outlines = np.stack([xy + (dx * board / 2, dy * board / 2) for dx, dy in ((-1, -1), (1, -1), (1, 1), (-1, 1))], 1)
+    ax.add_collection(PolyCollection(outlines, facecolors='none', linewidths=1.5,
+                                     edgecolors=[outline_color(node) for node in boards]))
+
+    # Edges leave the bottom of the parent and enter the top of the child
+    segments, path_segments = [], []
+    for parent, child in layout.edges:
+        (x0, y0), (x1, y1) = pos[parent], pos[child]
+        segment = ((x0, y0 - board / 2), (x1, y1 + board / 2))
+        (path_segments if parent in on_path and child in on_path else segments).append(segment)
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.6, alpha=0.7))
+    ax.add_collection(LineCollection(path_segments, colors=PATH_COLOR, linewidths=2.0))
+
+    # Marker and font sizes follow the length of one layout unit on screen, in points
+    points = np.array(list(pos.values()))
+    extent = points.max(axis=0) - points.min(axis=0) + 1.2
+    box = ax.get_window_extent()
+    unit = min(box.width / extent[0], box.height / extent[1]) * 72 / ax.figure.dpi
+
+    groups = list(collapsed.items())
+    if groups:
+        marks = np.array([pos[('collapsed', node)] for node, _ in groups])
+        ax.scatter(marks[:, 0], marks[:, 1], marker='s', color=COLLAPSED_COLOR, edgecolors='gray', zorder=3,
+                   s=[(unit * min(0.8, 0.3 + 0.1 * math.log10(count))) ** 2 for _, count in groups])
+
+    # Text, most informative first, until the budget is spent; text too small to read is left out
+    fontsize = min(9.0, 0.7 * cell * unit)
+    caption_size = min(9.0, 0.22 * unit)
+    labels = []
+
+    def tile_labels(node):
+        if fontsize < 3:
+            return
+        x, y = pos[node]
+        for k, tile in enumerate(tiles(node)):
+            if tile:
+                labels.append((x - board / 2 + (k % size + 0.5) * cell, y + board / 2 - (k // size + 0.5) * cell,
+                               str(tile), dict(ha='center', va='center', fontsize=fontsize)))
+    for node in path:
+        tile_labels(node)
+    for node, count in sorted(groups, key=lambda group: -group[1]) if caption_size >= 3 else ():
+        x, y = pos[('collapsed', node)]
+        labels.append((x, y - 0.35, f"+{count}", dict(ha='center', va='top', fontsize=caption_size)))
+    if node_text is not None and caption_size >= 3:
+        for node in sorted(boards, key=lambda node: node not in on_path):
+            x, y = pos[node]
+            labels.append((x, y - board / 2 - 0.05, node_text(node), dict(ha='center', va='top', fontsize=caption_size)))
+    for node in boards:
+        if node not in on_path:
+            tile_labels(node)
+        if len(labels) >= max_labels:
+            break
+    for x, y, text, style in labels[:max_labels]:
+        ax.text(x, y, text, **style)
+
+    if legend:
+        handles = [Line2D([0], [0], marker='s', color='w', markerfacecolor='none', markeredgecolor=color,
+                          markeredgewidth=2, markersize=10) for color in (START_COLOR, GOAL_COLOR, PATH_COLOR, OTHER_COLOR)]
+        handles.append(Line2D([0], [0], marker='s', color='w', markerfacecolor=COLLAPSED_COLOR, markersize=10))
+        ax.figure.legend(handles, ['Initial State', 'Goal State', 'Path to Goal', 'Explored Nodes', 'Collapsed Subtree'],
+                         loc='upper right')
+
+    ax.autoscale_view()
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return {'nodes': total, 'drawn': len(boards), 'collapsed': sum(collapsed.values()),
+            'labels': min(len(labels), max_labels)}